@@ -1,8 +1,8 @@
 import sys
 import os
+import contextlib
+import importlib
 import streamlit as st
-import pandas as pd
-import altair as alt
 
 # --- INÍCIO DA CORREÇÃO DE IMPORTAÇÃO ---
 # Adiciona o diretório raiz ao path do Python para encontrar 'src' e 'views'
@@ -11,11 +11,12 @@ if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 # --- FIM DA CORREÇÃO ---
 
+from src import instrument
 from src.config import DATA
-from src.styles import apply_global_styles, card
-from src.utils import fmt_money, money_or_blank, fmt_percent
-from src.calculations import get_net_salary, get_employer_cost, get_sti_targets
-from views import calculator, comparison, cost_comparison, info
+from src.styles import apply_global_styles
+
+# Instrumentação opcional (SIMULADOR_PROFILE=1): tempos desta reexecução
+instrument.begin_run()
 
 # Configuração Inicial da Página
 st.set_page_config(page_title="Simulador de Remuneração", layout="wide", page_icon="💰")
@@ -87,16 +88,33 @@ with st.sidebar:
 
     st.markdown("---")
     st.caption(f"v2025.11.07 | {st.session_state.locale}")
+    if instrument.enabled():
+        profile_engine = st.selectbox("Perfil", ["—", "cProfile", "pyinstrument"], key="profile_engine")
+        timing_slot = st.empty()
 
 # --- ROTEAMENTO DE VIZUALIZAÇÕES ---
+# Página -> (módulo em views/, função). O módulo só é importado quando a página
+# é aberta, então pandas/altair não pesam no carregamento das demais.
+PAGES = {
+    "calc_sim": ("calculator", "render_page"),
+    "comp_countries": ("comparison", "render_page"),
+    "comp_cost": ("cost_comparison", "render_page"),
+    "info_tables": ("info", "render_tables_page"),
+    "info_sti": ("info", "render_sti_page"),
+}
+
 # O 'T' (dicionário de tradução) é passado para cada página
-if current_page == "calc_sim":
-    calculator.render_page(T)
-elif current_page == "comp_countries":
-    comparison.render_page(T)
-elif current_page == "comp_cost":
-    cost_comparison.render_page(T)
-elif current_page == "info_tables":
-    info.render_tables_page(T)
-elif current_page == "info_sti":
-    info.render_sti_page(T)
+module_name, func_name = PAGES.get(current_page, PAGES["calc_sim"])
+page = importlib.import_module(f"views.{module_name}")
+profiling = instrument.enabled() and profile_engine != "—"
+with (instrument.profile(profile_engine.lower()) if profiling else contextlib.nullcontext()) as prof:
+    with instrument.span(f"view.{module_name}.{func_name}"):
+        getattr(page, func_name)(T)
+
+if instrument.enabled():
+    instrument.end_run()
+    with timing_slot.container():
+        with st.expander("⏱️ Tempos desta execução", expanded=False):
+            st.code(instrument.format_breakdown() or "—", language=None)
+            if profiling:
+                st.code(prof.report, language=None)
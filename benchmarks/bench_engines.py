@@ -0,0 +1,247 @@
+"""
+Benchmark dos motores de cálculo, com limite de regressão contra uma baseline.
+
+Cada caso roda para 1, 1k, 100k e 1M empregados (configurável). Cada rodada
+repete o caso até somar SAMPLE_TIME, e o tempo reportado é a mediana de
+ROUNDS rodadas. Os casos escalares chamam a função uma vez por empregado;
+os casos `*_batch` usam o motor vetorizado de src/batch.py.
+
+No modo --compare, casos abaixo de --noise-floor (ms por execução, na
+baseline) não reprovam: nessa escala a variação entre execuções passa do
+limite de regressão.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/bench_engines.py --json resultados.json
+    python benchmarks/bench_engines.py --save baseline.json
+    python benchmarks/bench_engines.py --compare baseline.json --threshold 15 --noise-floor 1
+    python benchmarks/bench_engines.py --sizes 1,1000 --only br
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import numpy as np  # noqa: E402
+
+from src import batch, projection  # noqa: E402
+from src.calculations import get_employer_cost, get_net_salary  # noqa: E402
+from src.utils import fmt_money, fmt_money_array  # noqa: E402
+
+DEFAULT_SIZES = (1, 1_000, 100_000, 1_000_000)
+DEFAULT_THRESHOLD = 10.0   # % de queda de throughput tolerada no modo --compare
+SAMPLE_TIME = 0.05         # tempo mínimo de cada rodada (s); casos rápidos repetem dentro dela
+ROUNDS = 5                 # rodadas por caso; reporta a mediana
+NOISE_FLOOR_MS = 1.0       # abaixo disto (ms por execução) o --compare só informa
+COMPARISON_COUNTRIES = ("Brasil", "Estados Unidos", "México", "Chile")
+
+
+def _inputs(n: int, seed: int = 42) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {
+        "salary": np.round(rng.uniform(1_000, 60_000, n), 2),
+        "dependents": rng.integers(0, 4, n),
+        "other": np.round(rng.uniform(0, 500, n), 2),
+        "bonus": np.round(rng.uniform(0, 80_000, n), 2),
+        "incide": rng.random(n) < 0.5,
+        "state_rate": rng.choice([0.0, 0.05, 0.064], n),
+    }
+
+
+# --------------------------------------------------------------------
+# Casos: recebem os dados e devolvem uma função sem argumentos a medir
+# --------------------------------------------------------------------
+def case_br_net(d):
+    rows = list(zip(d["salary"].tolist(), d["dependents"].tolist(), d["other"].tolist(),
+                    d["bonus"].tolist(), d["incide"].tolist()))
+    net = get_net_salary.uncached
+    return lambda: [net("Brasil", s, dependents=dep, other_deductions=o, bonus_annual=b, incide_medias=i)
+                    for s, dep, o, b, i in rows]
+
+
+def case_us_net(d):
+    rows = list(zip(d["salary"].tolist(), d["other"].tolist(), d["state_rate"].tolist()))
+    net = get_net_salary.uncached
+    return lambda: [net("Estados Unidos", s, other_deductions=o, state_rate=r, state_name="XX")
+                    for s, o, r in rows]
+
+
+def case_generic_net(d):
+    rows = list(zip(d["salary"].tolist(), d["other"].tolist()))
+    net = get_net_salary.uncached
+    return lambda: [net("México", s, other_deductions=o) for s, o in rows]
+
+
+def case_employer_cost(d):
+    rows = list(zip(d["salary"].tolist(), d["bonus"].tolist(), d["incide"].tolist()))
+    cost = get_employer_cost.uncached
+    return lambda: [cost("Brasil", s, b, i) for s, b, i in rows]
+
+
+def case_fmt_money(d):
+    values = d["salary"].tolist()
+    return lambda: [fmt_money(v, "R$") for v in values]
+
+
+def case_fmt_money_array(d):
+    return lambda: fmt_money_array(d["salary"], "R$")
+
+
+def case_comparison_page(d):
+    from views.comparison import build_comparison
+    salaries, bonuses = d["salary"].tolist(), d["bonus"].tolist()
+    return lambda: [build_comparison(COMPARISON_COUNTRIES, s, b) for s, b in zip(salaries, bonuses)]
+
+
+def case_br_net_batch(d):
+    return lambda: batch.get_net_salary_batch("Brasil", d["salary"], d["dependents"], d["other"],
+                                              d["bonus"], d["incide"])
+
+
+def case_us_net_batch(d):
+    return lambda: batch.get_net_salary_batch("Estados Unidos", d["salary"], other_deductions=d["other"],
+                                              state_rate=d["state_rate"])
+
+
+def case_generic_net_batch(d):
+    return lambda: batch.get_net_salary_batch("México", d["salary"], other_deductions=d["other"])
+
+
+def case_employer_cost_batch(d):
+    return lambda: batch.get_employer_cost_batch("Brasil", d["salary"], d["bonus"], d["incide"])
+
+
+def case_projection_batch(d):
+    return lambda: projection.project_year("Brasil", d["salary"], d["dependents"], d["other"],
+                                           d["bonus"], d["incide"], True)
+
+
+CASES: Dict[str, Callable] = {
+    "br_net": case_br_net,
+    "us_net": case_us_net,
+    "generic_net": case_generic_net,
+    "employer_cost": case_employer_cost,
+    "fmt_money": case_fmt_money,
+    "fmt_money_array": case_fmt_money_array,
+    "comparison_page": case_comparison_page,
+    "br_net_batch": case_br_net_batch,
+    "us_net_batch": case_us_net_batch,
+    "generic_net_batch": case_generic_net_batch,
+    "employer_cost_batch": case_employer_cost_batch,
+    "projection_batch": case_projection_batch,
+}
+
+
+def _loops(func: Callable[[], object], sample_time: float) -> int:
+    """Execuções por rodada para que cada rodada dure ao menos `sample_time`."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= sample_time:
+            return loops
+        loops *= 10
+
+
+def measure(func: Callable[[], object], rounds: int = ROUNDS,
+            sample_time: float = SAMPLE_TIME) -> Tuple[float, float]:
+    """(mediana, desvio relativo) do tempo (s) de uma execução em `rounds` rodadas."""
+    loops = _loops(func, sample_time)
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+    median = statistics.median(samples)
+    spread = (max(samples) - min(samples)) / median if median > 0 else 0.0
+    return median, spread
+
+
+def run(sizes, only: List[str] = None, rounds: int = ROUNDS) -> Dict:
+    results = []
+    for name, factory in CASES.items():
+        if only and not any(key in name for key in only):
+            continue
+        for n in sizes:
+            median, spread = measure(factory(_inputs(n)), rounds)
+            results.append({"case": name, "size": n, "seconds": median, "spread": spread,
+                            "rows_per_s": n / median if median > 0 else float("inf")})
+            print(f"{name:<22} {n:>9,}  {median * 1000:>10.3f} ms ±{spread * 100:>4.0f}%"
+                  f"  {results[-1]['rows_per_s']:>14,.0f} linhas/s")
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "results": results}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float,
+            noise_floor_ms: float = NOISE_FLOOR_MS) -> Tuple[List[str], List[str]]:
+    """
+    (regressões, avisos): casos cujo throughput caiu mais que `threshold` %.
+    Casos que levam menos de `noise_floor_ms` por execução na baseline entram
+    só nos avisos, assim como quedas dentro da variação medida entre rodadas.
+    """
+    base = {(r["case"], r["size"]): r for r in baseline.get("results", [])}
+    regressions, warnings = [], []
+    for r in current["results"]:
+        ref = base.get((r["case"], r["size"]))
+        if not ref or not ref["rows_per_s"]:
+            continue
+        drop = (1.0 - r["rows_per_s"] / ref["rows_per_s"]) * 100.0
+        if drop <= threshold:
+            continue
+        line = f"{r['case']} n={r['size']:,}: {drop:.1f}% mais lento que a baseline"
+        noise = max(r.get("spread", 0.0), ref.get("spread", 0.0)) * 100.0
+        if ref["seconds"] * 1000.0 < noise_floor_ms:
+            warnings.append(f"{line} (abaixo do piso de ruído de {noise_floor_ms:g} ms)")
+        elif drop <= noise:
+            warnings.append(f"{line} (dentro da variação medida, ±{noise:.0f}%)")
+        else:
+            regressions.append(line)
+    return regressions, warnings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="tamanhos separados por vírgula")
+    parser.add_argument("--only", help="roda só os casos que contêm estes termos (vírgula)")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    parser.add_argument("--save", help="grava os resultados como nova baseline")
+    parser.add_argument("--compare", help="baseline para comparação")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"queda máxima de throughput em %% (padrão: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--noise-floor", type=float, default=NOISE_FLOOR_MS,
+                        help=f"ms por execução abaixo dos quais o --compare não reprova (padrão: {NOISE_FLOOR_MS})")
+    parser.add_argument("--rounds", type=int, default=ROUNDS,
+                        help=f"rodadas por caso; reporta a mediana (padrão: {ROUNDS})")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    only = [s for s in args.only.split(",") if s] if args.only else None
+    current = run(sizes, only, args.rounds)
+
+    for path in filter(None, (args.json, args.save)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions, warnings = compare(current, json.load(f), args.threshold, args.noise_floor)
+        for line in warnings:
+            print(f"aviso: {line}", file=sys.stderr)
+        for line in regressions:
+            print(f"REGRESSÃO: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Benchmark de tempo de importação (`python -X importtime`).
+
+Mede o motor de cálculo (sem UI) e o app Streamlit em processos novos e
+verifica que o motor não arrasta streamlit/pandas/altair.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/importtime.py
+    python benchmarks/importtime.py --json importtime.json --max-engine-ms 150
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "engine": "import src.calculations, src.config, src.utils",
+    "app": "import streamlit, src.styles, views.calculator, views.comparison, views.cost_comparison, views.info",
+}
+
+# Módulos que não podem aparecer na importação do motor
+ENGINE_FORBIDDEN = ("streamlit", "pandas", "altair")
+
+
+def measure(statement: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """Roda `statement` num processo novo; retorna (ms totais, [(módulo, self_us, cumulativo_us)])."""
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                          cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True)
+    modules, total_us = [], 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+        total_us += int(self_us)
+    return total_us / 1000.0, modules
+
+
+def run(top: int = 10) -> Dict:
+    results = {}
+    for target, statement in TARGETS.items():
+        total_ms, modules = measure(statement)
+        top_level = sorted({m[0].split(".")[0] for m in modules})
+        results[target] = {
+            "statement": statement,
+            "total_ms": round(total_ms, 2),
+            "modules": len(modules),
+            "slowest": [{"module": name, "cumulative_ms": round(cum / 1000.0, 2)}
+                        for name, _, cum in sorted(modules, key=lambda m: -m[2])[:top]],
+            "forbidden": [m for m in ENGINE_FORBIDDEN if m in top_level] if target == "engine" else [],
+        }
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", help="grava o resultado neste arquivo")
+    parser.add_argument("--max-engine-ms", type=float, help="falha se o motor passar deste tempo")
+    parser.add_argument("--top", type=int, default=10, help="módulos mais lentos listados")
+    args = parser.parse_args(argv)
+
+    results = run(args.top)
+    for target, res in results.items():
+        print(f"{target:<7} {res['total_ms']:>9.1f} ms  ({res['modules']} módulos)")
+        for item in res["slowest"][:5]:
+            print(f"        {item['cumulative_ms']:>9.1f} ms  {item['module']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failures = []
+    if results["engine"]["forbidden"]:
+        failures.append(f"motor importa {', '.join(results['engine']['forbidden'])}")
+    if args.max_engine_ms is not None and results["engine"]["total_ms"] > args.max_engine_ms:
+        failures.append(f"motor levou {results['engine']['total_ms']:.1f} ms (> {args.max_engine_ms} ms)")
+    for failure in failures:
+        print(f"FALHA: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
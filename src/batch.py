@@ -0,0 +1,251 @@
+"""
+Motor vetorizado (NumPy) para cálculo de líquido em lote.
+
+Aplica as mesmas regras de `src/calculations.py` (compiladas em src/rules.py),
+mas recebe arrays com o quadro inteiro de um país e devolve arrays de INSS,
+IRRF, impostos estaduais e líquido. Os resultados batem com os cálculos
+escalares centavo a centavo.
+"""
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import DATA
+from src.instrument import timed
+from src.registry import date_array
+from src.rules import NetInputs, _as_array
+from src.tables import TableSet
+
+
+# --- FACHADA PRINCIPAL (Lote) ---
+@timed("batch.net_salary")
+def get_net_salary_batch(country: str, salary, dependents=None, other_deductions=None,
+                         bonus_annual=None, incide_medias=None,
+                         state_rate: Optional[object] = None,
+                         tables: Optional[TableSet] = None) -> Dict[str, np.ndarray]:
+    """
+    Versão em lote de `get_net_salary` para um país.
+    Todos os parâmetros aceitam escalar (aplicado a todos) ou array por empregado.
+    `tables` escolhe uma versão do registro (src/registry.py); sem ela, valem as tabelas atuais.
+    """
+    salary = np.asarray(salary, dtype=np.float64)
+    n = salary.size
+    incide = np.broadcast_to(np.asarray(incide_medias if incide_medias is not None else False, dtype=bool), (n,))
+    x = NetInputs(salary, _as_array(dependents, n), _as_array(other_deductions, n),
+                  _as_array(bonus_annual, n), incide, _as_array(state_rate, n))
+    # Mesmas regras do cálculo escalar (src/rules.py), aplicadas a arrays
+    return DATA.rules.get(country).net_batch(x, tables if tables is not None else DATA.registry.base(country))
+
+
+# --- AGRUPAMENTO POR PAÍS E VERSÃO DAS TABELAS ---
+def group_rows(countries, dates=None):
+    """
+    Itera (país, índices, versão) na ordem em que os países aparecem. Com `dates`
+    (coluna reference_date), cada linha usa a versão vigente na sua data (registro
+    de src/registry.py) e cada grupo de versão é calculado de uma vez; sem ela,
+    ou com a data vazia na linha, versão = None (tabelas atuais).
+    """
+    countries = np.asarray(countries, dtype=object)
+    unique, first, inverse = np.unique(countries.astype(str), return_index=True, return_inverse=True)
+    dates = date_array(dates) if dates is not None else None
+    for k in np.argsort(first):
+        country, idx = unique[k], np.flatnonzero(inverse == k)
+        versions = DATA.registry.versions(country) if dates is not None else ()
+        if not versions:
+            yield country, idx, None
+            continue
+        version_idx = DATA.registry.index_batch(country, dates[idx])
+        for v in np.unique(version_idx):
+            yield country, idx[version_idx == v], (versions[v] if v >= 0 else None)
+
+
+# Grafias aceitas nas colunas de sim/não (incide_medias, incide_bonus), sem caixa nem espaços
+TRUE_VALUES = frozenset({"true", "1", "1.0", "sim", "s", "yes", "y", "t", "verdadeiro"})
+FALSE_VALUES = frozenset({"false", "0", "0.0", "não", "nao", "n", "no", "f", "falso"})
+_EMPTY_VALUES = frozenset({"", "nan", "none", "<na>"})
+
+
+def _flags(values, name: str, default: bool = False) -> np.ndarray:
+    """Coluna de sim/não; vazio vale `default` e grafias desconhecidas levantam ValueError."""
+    values = np.asarray(values.to_numpy() if hasattr(values, "to_numpy") else values)
+    if values.dtype == bool:
+        return values
+    unique, inverse = np.unique(values.astype(str), return_inverse=True)
+    parsed, unknown = [], []
+    for text in unique.tolist():
+        key = text.strip().lower()
+        if key in _EMPTY_VALUES:
+            parsed.append(default)
+        elif key in TRUE_VALUES or key in FALSE_VALUES:
+            parsed.append(key in TRUE_VALUES)
+        else:
+            unknown.append(text)
+    if unknown:
+        raise ValueError(f"Coluna '{name}': valores não reconhecidos {', '.join(map(repr, unknown[:5]))} "
+                         "(use true/false, sim/não ou 1/0)")
+    return np.array(parsed, dtype=bool)[inverse.ravel()]
+
+
+def _column(columns, name: str, n: int, dtype=np.float64, default=0):
+    """Coluna opcional como array; ausente ou vazia (None/NaN de CSV e Parquet) vale `default`."""
+    if name not in columns:
+        return np.full(n, default, dtype=dtype)
+    values = columns[name]
+    if dtype is bool:   # texto de CSV ("False", "não") não pode virar True no astype
+        return _flags(values, name, bool(default))
+    if hasattr(values, "fillna"):   # Series do pandas
+        return values.fillna(default).to_numpy(dtype=dtype)
+    values = np.asarray(values)
+    if values.dtype.kind in "fO":   # listas/arrays: NaN e None antes da conversão
+        missing = np.array([v is None or v != v for v in values.tolist()], dtype=bool) \
+            if values.dtype.kind == "O" else np.isnan(values)
+        if missing.any():
+            values = np.where(missing, default, values)
+    return values.astype(dtype)
+
+
+def _state_rates(columns, n: int) -> np.ndarray:
+    """Alíquota estadual (EUA) a partir da coluna `state`; UF desconhecida = 0."""
+    if "state" not in columns:
+        return np.zeros(n)
+    unique, inverse = np.unique(np.asarray(columns["state"], dtype=object).astype(str), return_inverse=True)
+    return np.array([float(DATA.us_rates.get(state, 0.0)) for state in unique])[inverse]
+
+
+# Totais do resultado colunar de líquido, depois das colunas dos componentes
+NET_TOTALS = ("total_earnings", "total_deductions", "net_salary", "fgts")
+
+
+def all_net_components() -> Tuple[str, ...]:
+    """Colunas de todos os componentes do líquido (países e versões), em ordem estável."""
+    keys = {}
+    for country in DATA.registry.countries():
+        rules = DATA.rules.get(country)
+        for tables in DATA.registry.versions(country):
+            keys.update(dict.fromkeys(rules.keys(tables)))
+    return tuple(keys)
+
+
+def net_salary_columns(columns, component_names: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Líquido colunar sem pandas: `columns` mapeia nome -> array/lista (country e
+    salary_monthly obrigatórias; dependents, other_deductions, bonus_annual,
+    incide_medias, state e reference_date opcionais). Retorna uma coluna por
+    componente (INSS, IRRF, Social Security, tributos de TABLES...; zeros onde
+    não se aplica) seguida de NET_TOTALS. `component_names` fixa o conjunto/ordem
+    dos componentes (padrão: `all_net_components()`, esquema estável entre blocos).
+    """
+    country = np.asarray(columns["country"], dtype=object)
+    n = country.size
+    names = all_net_components() if component_names is None else component_names
+    out = {key: np.zeros(n) for key in (*names, *NET_TOTALS)}
+
+    salary = _column(columns, "salary_monthly", n)
+    dependents = _column(columns, "dependents", n)
+    other = _column(columns, "other_deductions", n)
+    bonus = _column(columns, "bonus_annual", n)
+    incide = _column(columns, "incide_medias", n, bool, False)
+    state_rate = _state_rates(columns, n)
+    dates = columns["reference_date"] if "reference_date" in columns else None
+
+    for name, idx, tables in group_rows(country, dates):
+        res = get_net_salary_batch(name, salary[idx], dependents[idx], other[idx],
+                                   bonus[idx], incide[idx], state_rate[idx], tables)
+        for key, values in res.items():
+            if key in out:
+                out[key][idx] = values
+    return out
+
+
+def get_net_salary_frame(df):
+    """
+    Líquido colunar para um DataFrame com as colunas de `net_salary_columns`.
+    Retorna o DataFrame com as colunas dos componentes e de NET_TOTALS acrescentadas.
+    """
+    import pandas as pd
+
+    return pd.concat([df, pd.DataFrame(net_salary_columns(df), index=df.index)], axis=1)
+
+
+# --- CUSTO EMPREGADOR (Lote / Colunar) ---
+@timed("batch.employer_cost")
+def get_employer_cost_batch(country: str, salary_monthly, bonus_annual=None,
+                            incide_bonus=None, tables: Optional[TableSet] = None) -> Dict[str, np.ndarray]:
+    """Versão em lote de `get_employer_cost`, com um array por encargo em 'charges'."""
+    salary_monthly = np.asarray(salary_monthly, dtype=np.float64)
+    n = salary_monthly.size
+    bonus_annual = _as_array(bonus_annual, n)
+    incide = np.broadcast_to(np.asarray(incide_bonus if incide_bonus is not None else False, dtype=bool), (n,))
+    table = tables.charges if tables else DATA.employer_charges.get(country)
+    months_factor = table.months_factor if table else 12.0
+
+    annual_base_salary = salary_monthly * 12.0
+    base = annual_base_salary if table and table.base_12 else salary_monthly * months_factor
+
+    charges = {}
+    total_charges = np.zeros(n)
+    if table is not None:
+        for name, rate, cap, on_bonus in zip(table.names, table.rates, table.caps, table.on_bonus):
+            current_base = np.where(incide, base + bonus_annual, base) if on_bonus else base
+            if cap is not None:
+                current_base = np.minimum(current_base, cap)
+            val = current_base * rate
+            charges[name] = val
+            total_charges = total_charges + val
+
+    total_annual_cost = (salary_monthly * months_factor) + bonus_annual + total_charges
+    with np.errstate(divide="ignore", invalid="ignore"):
+        multiplier = np.where(annual_base_salary > 0, total_annual_cost / annual_base_salary, 0.0)
+    return {"total_cost": total_annual_cost, "total_charges": total_charges, "multiplier": multiplier,
+            "months_factor": np.full(n, months_factor), "charges": charges}
+
+
+def all_charge_names() -> Tuple[str, ...]:
+    """Nomes de todos os encargos cadastrados, em ordem estável (esquema fixo de colunas)."""
+    names = {}
+    for table in DATA.employer_charges.values():
+        names.update(dict.fromkeys(table.names))
+    return tuple(names)
+
+
+COST_COLUMNS = ("months_factor", "total_charges", "total_cost", "multiplier")
+
+
+def employer_cost_columns(columns, charge_names: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Custo empregador colunar sem pandas: `columns` com country e salary_monthly
+    (obrigatórias), bonus_annual, incide_bonus e reference_date (opcionais).
+    Retorna uma coluna por encargo de EMPLOYER_COST seguida de COST_COLUMNS;
+    `charge_names` fixa o conjunto/ordem dos encargos (útil ao processar em blocos).
+    """
+    country = np.asarray(columns["country"], dtype=object)
+    n = country.size
+    out = {key: np.zeros(n) for key in COST_COLUMNS}
+    charge_cols: Dict[str, np.ndarray] = {name: np.zeros(n) for name in (charge_names or ())}
+
+    salary = _column(columns, "salary_monthly", n)
+    bonus = _column(columns, "bonus_annual", n)
+    incide = _column(columns, "incide_bonus", n, bool, False)
+    dates = columns["reference_date"] if "reference_date" in columns else None
+
+    for name, idx, tables in group_rows(country, dates):
+        res = get_employer_cost_batch(name, salary[idx], bonus[idx], incide[idx], tables)
+        for key in out:
+            out[key][idx] = res[key]
+        for charge, values in res["charges"].items():
+            if charge_names is None or charge in charge_cols:
+                charge_cols.setdefault(charge, np.zeros(n))[idx] = values
+
+    charge_cols.update(out)
+    return charge_cols
+
+
+def get_employer_cost_frame(df, charge_names: Optional[Sequence[str]] = None):
+    """
+    Custo empregador colunar para um DataFrame com as colunas de `employer_cost_columns`.
+    Retorna um DataFrame largo com uma coluna por encargo de EMPLOYER_COST.
+    """
+    import pandas as pd
+
+    result = pd.DataFrame(employer_cost_columns(df, charge_names), index=df.index)
+    return pd.concat([df, result], axis=1)
@@ -0,0 +1,141 @@
+"""
+Simulação em massa, sem interface, a partir de arquivos CSV ou Parquet.
+
+Lê o arquivo de funcionários em blocos, passa cada bloco pelos motores
+vetorizados de líquido e custo empregador (src/batch.py) e grava o
+resultado incrementalmente, então o uso de memória não cresce com o
+tamanho do arquivo.
+
+Uso (a partir da raiz do projeto):
+    python -m src.bulk funcionarios.csv resultado.parquet --chunksize 200000
+
+Colunas de entrada: country, salary_monthly (obrigatórias) e, opcionalmente,
+dependents, other_deductions, bonus_annual, incide_medias, incide_bonus, state e
+reference_date (data da competência: escolhe a versão vigente das tabelas).
+
+Saída .parquet ou .arrow/.feather/.ipc (formato de arquivo Arrow IPC) é
+montada direto dos arrays dos motores (src/export.py), sem DataFrame
+intermediário, com país/moeda como colunas de dicionário; .csv usa o pandas.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Iterator, Optional, Tuple
+
+from src import export
+from src.batch import all_charge_names, get_employer_cost_frame, get_net_salary_frame
+
+REQUIRED_COLUMNS = ("country", "salary_monthly")
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def _is_parquet(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise SystemExit("Leitura/escrita de Parquet requer o pacote 'pyarrow'.") from e
+    return pq
+
+
+def read_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator:
+    """Itera o arquivo de entrada em DataFrames de até `chunksize` linhas."""
+    import pandas as pd
+
+    if _is_parquet(path):
+        pq = _require_pyarrow()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def _is_arrow_output(path: str) -> bool:
+    ext = os.path.splitext(path)[1].lower()
+    return ext in export.IPC_EXTENSIONS or ext in export.PARQUET_EXTENSIONS
+
+
+class ChunkWriter:
+    """Grava blocos de resultado em CSV (append) ou, via src/export.py, Parquet/Arrow IPC."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.arrow = _is_arrow_output(path)
+        self._writer = None
+        self._header = True
+        if self.arrow:
+            _require_pyarrow()
+            self._writer = export.TableWriter(path)
+
+    def write(self, chunk, charge_names: Optional[Tuple[str, ...]] = None) -> None:
+        """`chunk` é o bloco de entrada: o cálculo é feito aqui, no caminho de cada formato."""
+        if self.arrow:
+            _check_columns(chunk)
+            self._writer.write(export.results_table(chunk, charge_names))
+        else:
+            df = simulate_chunk(chunk, charge_names)
+            df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_columns(df) -> None:
+    missing = [col for col in REQUIRED_COLUMNS if col not in df]
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+
+
+def simulate_chunk(df, charge_names: Optional[Tuple[str, ...]] = None):
+    """Aplica líquido e custo empregador a um bloco; esquema de colunas estável."""
+    _check_columns(df)
+    result = get_net_salary_frame(df)
+    cost = get_employer_cost_frame(df, charge_names if charge_names is not None else all_charge_names())
+    return result.join(cost.drop(columns=df.columns))
+
+
+def run(input_path: str, output_path: str, chunksize: int = DEFAULT_CHUNKSIZE,
+        verbose: bool = False) -> Tuple[int, float]:
+    """Processa o arquivo inteiro; retorna (linhas, segundos)."""
+    charge_names = all_charge_names()
+    rows, start = 0, time.perf_counter()
+    with ChunkWriter(output_path) as writer:
+        for chunk in read_chunks(input_path, chunksize):
+            writer.write(chunk, charge_names)
+            rows += len(chunk)
+            if verbose:
+                print(f"{rows:,} linhas processadas", file=sys.stderr)
+    return rows, time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.bulk",
+                                     description="Simulação em massa de líquido e custo empregador.")
+    parser.add_argument("input", help="arquivo de funcionários (.csv ou .parquet)")
+    parser.add_argument("output", help="arquivo de resultado (.csv, .parquet ou .arrow)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"linhas por bloco (padrão: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("-v", "--verbose", action="store_true", help="mostra o progresso por bloco")
+    args = parser.parse_args(argv)
+
+    rows, elapsed = run(args.input, args.output, args.chunksize, args.verbose)
+    rate = rows / elapsed if elapsed > 0 else float("inf")
+    print(f"{rows:,} linhas em {elapsed:.2f}s ({rate:,.0f} linhas/s) -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Cache LRU em memória para resultados dos cálculos.
+
+O Streamlit reexecuta o script inteiro a cada interação; com o cache,
+entradas repetidas (mesmo país, salário, parâmetros e versão das tabelas)
+devolvem o resultado já calculado. O cache é compartilhado entre as sessões
+do mesmo processo, por isso é protegido por lock. Só os resultados caros
+(curvas de salário e gross-up) têm uma segunda camada em disco, compartilhada
+entre processos (src/diskcache.py); líquido e custo empregador ficam só aqui.
+"""
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Mapa com tamanho máximo e descarte do item usado há mais tempo."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = max(int(maxsize), 0)
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data),
+                "maxsize": self.maxsize, "hit_rate": (self.hits / total) if total else 0.0}
+
+
+def memoize(cache: LRUCache, key_func: Callable[..., Hashable], shared: Optional[Any] = None):
+    """
+    Decorador que guarda o retorno de `func` em `cache`, usando `key_func`
+    (mesma assinatura da função) para normalizar as entradas.
+    Com `shared` (um DiskCache), uma ausência no LRU consulta o disco antes de
+    calcular e o resultado calculado é gravado nas duas camadas.
+    Os valores em cache são compartilhados: quem chama não deve modificá-los.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = key_func(*args, **kwargs)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = shared.get(key, _MISSING) if shared is not None else _MISSING
+                if value is _MISSING:
+                    value = func(*args, **kwargs)
+                    if shared is not None:
+                        shared.put(key, value)
+                cache.put(key, value)
+            return value
+        wrapper.cache = cache
+        wrapper.shared = shared
+        wrapper.uncached = func
+        return wrapper
+    return decorator
@@ -1,49 +1,286 @@
 import os
+import copy
 import json
-import streamlit as st
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, Sequence
+
+from src.instrument import timed
+from src.registry import OLDEST_DATE, build_registry, iso_date
+from src.tables import (TableSet, compile_inss, compile_irrf, compile_flat_rates,
+                        compile_charges, compile_sti_ranges)
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------------
+# Tabelas de tetos anuais (compatibilidade com cálculos)
+# ------------------------------------------------------------------------
+# UMA (Unidade de Medida e Atualização) diária do México, vigente em 2025 (MXN).
+# Atualizar todo fevereiro, quando o INEGI publica o valor do ano.
+MX_UMA_DAILY = 113.14
+
+ANNUAL_CAPS = {
+    "BR": {"INSS": 908.85 * 13, "FGTS": None},
+    "CL": {"AFP": 81.6 * 12, "CES": 122.6 * 12},
+    "US": {"FICA_SS": 168600, "FICA_MEDICARE": None},
+    "CA": {"CPP": 68500, "EI": 63600},
+    "MX": {"IMSS": 25 * MX_UMA_DAILY * 365},   # salário base de cotização do IMSS: até 25 UMAs/dia
+}
+
+# Atalhos usados diretamente pelos motores de cálculo
+ANNUAL_CAPS["US_FICA"] = ANNUAL_CAPS["US"]["FICA_SS"]
+ANNUAL_CAPS["MX_UMA_MONTHLY"] = ANNUAL_CAPS["MX"]["IMSS"] / 12.0   # 25 UMAs/dia, por mês
+
+# País -> chave de ANNUAL_CAPS (tetos anuais levados para o registro de versões)
+ANNUAL_CAPS_BY_COUNTRY = {"Brasil": "BR", "Chile": "CL", "Estados Unidos": "US",
+                          "Canadá": "CA", "México": "MX"}
+
+# Tamanho máximo do cache LRU de resultados (src/cache.py); 0 desativa
+RESULT_CACHE_SIZE = int(os.environ.get("SIMULADOR_CACHE_SIZE", "4096"))
+
+
+# Diretório dos arquivos de dados (independe do diretório de trabalho)
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Intervalo mínimo (s) entre verificações de mtime/tamanho de cada arquivo
+RELOAD_CHECK_INTERVAL = float(os.environ.get("SIMULADOR_RELOAD_INTERVAL", "2.0"))
+
+# Atributo -> (arquivo, default). Cada tabela é lida só no primeiro acesso.
+DATA_FILES = {
+    "i18n": ("i18n.json", {"Português": {"sidebar_title": "Carregando..."}}),
+    "sti_config": ("sti_config.json", {}),
+    "countries": ("countries.json", {}),
+    "country_tables": ("country_tables.json", {}),
+    "country_rules": ("regras_paises.json", {}),
+    "br_inss": ("br_inss.json", {}),
+    "br_irrf": ("br_irrf.json", {}),
+    "us_rates": ("us_state_tax_rates.json", {}),
+    "table_history": ("table_history.json", {}),
+    "salary_tables": ("tabelas_salarios.json", {}),
+    "fx_rates": ("fx_rates.json", {}),
+}
+
+# Atributo derivado -> arquivos de origem; recompilado quando algum deles muda
+DERIVED = {
+    "STI_LEVEL_OPTIONS": ("sti_config",),
+    "STI_RANGES": ("sti_config",),
+    # Tudo o que entra nos resultados memorizados e no grafo das páginas (src/incremental.py)
+    "table_version": ("br_inss", "br_irrf", "country_tables", "country_rules", "us_rates",
+                      "countries", "sti_config", "fx_rates"),
+    "rules": ("country_rules",),
+    "inss_table": ("br_inss",),
+    "irrf_table": ("br_irrf",),
+    "net_rates": ("country_tables", "country_rules"),
+    "remun_months": ("country_tables",),
+    "employer_charges": ("country_tables", "countries", "country_rules"),
+    "registry": ("table_history", "br_inss", "br_irrf", "country_tables", "countries", "country_rules"),
+    "currencies": ("countries", "salary_tables"),
+    "fx": ("fx_rates",),
+}
+
+
+def _content_hash(paths: Sequence[str]) -> str:
+    """Hash dos bytes dos arquivos, sem parsear (arquivo ausente também entra no hash)."""
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(os.path.basename(path).encode("utf-8") + b"\0")
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b"<ausente>")
+    return digest.hexdigest()
+
+
+class _LazyTable:
+    """Descritor dos atributos de DataLoader: lê/compila no acesso e confere mtime periodicamente."""
+
+    def __init__(self, name: str, derived: bool):
+        self.name = name
+        self.derived = derived
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        # Caminho rápido: valor ainda dentro da janela de verificação
+        entry = (obj._derived if self.derived else obj._files).get(self.name)
+        if entry is not None and time.monotonic() < entry[2]:
+            return entry[0]
+        return obj._derived_value(self.name) if self.derived else obj._file(self.name)[0]
 
 
 class DataLoader:
     """
     Classe responsável por carregar arquivos JSON e parâmetros do app.
     Compatível com Streamlit Cloud e Python 3.13.
+
+    Os arquivos são lidos sob demanda, no primeiro acesso ao atributo
+    (ex: DATA.br_inss), e relidos apenas quando mtime/tamanho mudam, o que
+    permite publicar tabelas novas sem reiniciar o servidor. Atributos
+    derivados (tabelas compiladas, STI) são refeitos quando a origem muda.
     """
 
-    def __init__(self):
-        # Defaults convertidos em string (para evitar UnhashableParamError)
-        default_i18n = json.dumps({"Português": {"sidebar_title": "Carregando..."}})
-        default_empty = "{}"
+    def __init__(self, data_dir: str = DATA_DIR):
+        self._data_dir = data_dir
+        self._files = {}     # atributo -> (conteúdo, (mtime, tamanho), próxima verificação)
+        self._derived = {}   # atributo -> (valor, carimbos das origens, próxima verificação)
+        self._lock = threading.RLock()
 
-        # Carregamento dos arquivos
-        self.i18n = self._load_json("i18n.json", default_str=default_i18n)
-        self.sti_config = self._load_json("sti_config.json", default_str=default_empty)
-        self.countries = self._load_json("countries.json", default_str=default_empty)
-        self.tables = self._load_json("tables.json", default_str=default_empty)
+    # --------------------------------------------------------------------
+    # Leitura sob demanda com recarga por mtime/tamanho
+    # --------------------------------------------------------------------
+    def _stamp(self, filename: str):
+        try:
+            st_ = os.stat(os.path.join(self._data_dir, filename))
+            return (st_.st_mtime_ns, st_.st_size)
+        except OSError:
+            return None
+
+    def _file(self, name: str):
+        entry = self._files.get(name)
+        now = time.monotonic()
+        if entry is not None and now < entry[2]:
+            return entry
+        filename, default = DATA_FILES[name]
+        with self._lock:
+            entry = self._files.get(name)
+            stamp = self._stamp(filename)
+            deadline = now + RELOAD_CHECK_INTERVAL
+            if entry is None or entry[1] != stamp:
+                entry = (self._load_json(filename, default), stamp, deadline)
+            else:
+                entry = (entry[0], stamp, deadline)
+            self._files[name] = entry
+        return entry
+
+    def _derived_value(self, name: str):
+        cached = self._derived.get(name)
+        now = time.monotonic()
+        if cached is not None and now < cached[2]:
+            return cached[0]
+        # Carimbos direto do disco: o JSON só é lido se for preciso recompilar
+        stamps = tuple(self._stamp(DATA_FILES[src][0]) for src in DERIVED[name])
+        with self._lock:
+            if cached is not None and cached[1] == stamps:
+                value = cached[0]
+            else:
+                value = getattr(self, f"_build_{name}")()
+            self._derived[name] = (value, stamps, now + RELOAD_CHECK_INTERVAL)
+        return value
+
+    def _source_paths(self, names):
+        sources = dict.fromkeys(src for name in names for src in DERIVED[name])
+        return [os.path.join(self._data_dir, DATA_FILES[src][0]) for src in sources]
 
-        # Criação dos atributos usados nas views e cálculos
-        self.STI_LEVEL_OPTIONS = self._extract_sti_levels()
-        self.STI_RANGES = self._extract_sti_ranges()
+    def preload(self):
+        """Lê e compila todas as tabelas agora (valida os dados antes de um lote)."""
+        for name in (*DATA_FILES, *DERIVED):
+            getattr(self, name)
+        return self
+
+    def reload(self):
+        """Descarta tudo; os arquivos são relidos no próximo acesso."""
+        with self._lock:
+            self._files.clear()
+            self._derived.clear()
 
     # --------------------------------------------------------------------
-    # Cache seguro
+    # Compilação das tabelas usadas nos cálculos
+    # (src/tables.py levanta TableError se algum arquivo estiver malformado)
     # --------------------------------------------------------------------
-    @st.cache_data(show_spinner=False)
-    def _load_json(_self, filename: str, default_str: str = "{}"):
+    def _build_STI_LEVEL_OPTIONS(self):
+        return self._extract_sti_levels()
+
+    def _build_STI_RANGES(self):
+        return compile_sti_ranges(self._extract_sti_ranges())
+
+    def _build_table_version(self):
+        # Versão das tabelas: hash do conteúdo dos arquivos usados nos cálculos (sem parsear)
+        return _content_hash(self._source_paths(("table_version",)))[:12]
+
+    def _build_rules(self):
+        # Import local: src.rules (e numpy, que ele importa) não pesam na importação deste módulo;
+        # são carregados na primeira compilação das tabelas (net_rates/encargos também leem as regras)
+        from src.rules import compile_rules
+        return compile_rules(self.country_rules)
+
+    def _flat_rate_caps(self, country: str, caps: Optional[Dict] = None):
+        # Tetos das alíquotas simplificadas (regras_paises.json) resolvidos em ANNUAL_CAPS
+        # (ou nos tetos de uma versão do histórico, quando informados)
+        if caps is None:
+            caps = ANNUAL_CAPS.get(ANNUAL_CAPS_BY_COUNTRY.get(country), {})
+        return self.rules.get(country).flat_rate_caps(caps)
+
+    def _build_inss_table(self):
+        return compile_inss(self.br_inss)
+
+    def _build_irrf_table(self):
+        return compile_irrf(self.br_irrf)
+
+    def _build_net_rates(self):
+        tables = self.country_tables.get("TABLES", {})
+        return {country: compile_flat_rates(country, raw, self._flat_rate_caps(country))
+                for country, raw in tables.items()}
+
+    def _build_remun_months(self):
+        return {country: float(months) for country, months
+                in self.country_tables.get("REMUN_MONTHS", {}).items()}
+
+    def _build_employer_charges(self):
+        employer_cost = self.country_tables.get("EMPLOYER_COST", {})
+        remun_months = self._build_remun_months()
+        return {
+            country: compile_charges(country, employer_cost.get(country, []),
+                                     remun_months.get(country, 12.0),
+                                     self.rules.get(country).base_12)
+            for country in dict.fromkeys([*employer_cost, *remun_months, *self.countries])
+        }
+
+    def _build_registry(self):
+        # Versão atual de cada país (arquivos de hoje) + versões de table_history.json
+        base = {}
+        for country in dict.fromkeys([*self.countries, *self.employer_charges]):
+            info = self.countries.get(country, {})
+            caps = ANNUAL_CAPS.get(ANNUAL_CAPS_BY_COUNTRY.get(country), {})
+            base[country] = TableSet(
+                country=country,
+                valid_from=iso_date(info.get("valid_from", OLDEST_DATE)),
+                inss=self.inss_table if country == "Brasil" else None,
+                irrf=self.irrf_table if country == "Brasil" else None,
+                flat_rates=self.net_rates.get(country),
+                charges=self.employer_charges.get(country),
+                annual_caps=tuple(caps.items()),
+            )
+        return build_registry(base, self.table_history, self._flat_rate_caps,
+                              self.rules.base_12_countries(base))
+
+    def _build_currencies(self):
+        # Código ISO da moeda de cada país: countries.json ("currency") ou tabelas_salarios.json ("moeda")
+        codes = {p.get("pais"): p.get("moeda") for p in self.salary_tables.get("paises", [])
+                 if isinstance(p, dict) and p.get("moeda")}
+        return {country: info.get("currency", codes.get(country))
+                for country, info in self.countries.items()
+                if info.get("currency", codes.get(country))}
+
+    def _build_fx(self):
+        from src.fx import compile_fx   # numpy só é importado quando o câmbio é usado
+        return compile_fx(self.fx_rates)
+
+    @timed("data.load_json")
+    def _load_json(self, filename: str, default=None):
         """
-        Lê arquivo JSON do diretório /data com cache seguro.
+        Lê arquivo JSON do diretório de dados; em caso de erro usa o default.
         """
         try:
-            path = os.path.join("data", filename)
+            path = os.path.join(self._data_dir, filename)
             if os.path.exists(path):
                 with open(path, "r", encoding="utf-8") as f:
                     return json.load(f)
-            return json.loads(default_str)
         except Exception as e:
-            st.warning(f"⚠️ Erro ao carregar {filename}: {e}")
-            try:
-                return json.loads(default_str)
-            except Exception:
-                return {}
+            logger.warning("Erro ao carregar %s: %s", filename, e)
+        return copy.deepcopy(default) if default is not None else {}
 
     # --------------------------------------------------------------------
     # Extrai áreas e níveis do STI (ex: Comercial / Corporativo)
@@ -59,8 +296,9 @@ class DataLoader:
         """
         if not self.sti_config or not isinstance(self.sti_config, dict):
             return {}
-        if "areas" in self.sti_config and isinstance(self.sti_config["areas"], dict):
-            return self.sti_config["areas"]
+        for key in ("STI_LEVEL_OPTIONS", "areas"):
+            if key in self.sti_config and isinstance(self.sti_config[key], dict):
+                return self.sti_config[key]
         return self.sti_config
 
     # --------------------------------------------------------------------
@@ -79,35 +317,31 @@ class DataLoader:
         """
         if not self.sti_config or not isinstance(self.sti_config, dict):
             return {}
-        if "ranges" in self.sti_config and isinstance(self.sti_config["ranges"], dict):
-            return self.sti_config["ranges"]
-        # Fallback: se não houver ranges definidos, gera padrão
-        return {area: {"min": 0.8, "max": 1.2} for area in self._extract_sti_levels().keys()}
+        for key in ("STI_RANGES", "ranges"):
+            if key in self.sti_config and isinstance(self.sti_config[key], dict):
+                return self.sti_config[key]
+        # Fallback: se não houver ranges definidos, gera padrão para cada nível
+        return {area: {level: {"min": 0.8, "max": 1.2} for level in levels}
+                for area, levels in self._extract_sti_levels().items()}
 
     # --------------------------------------------------------------------
     # Fallback sem cache
     # --------------------------------------------------------------------
     def _load(self, filename: str, default=None):
-        path = os.path.join("data", filename)
+        path = os.path.join(self._data_dir, filename)
         if os.path.exists(path):
             with open(path, "r", encoding="utf-8") as f:
                 return json.load(f)
         return default or {}
 
 
+for _name in DATA_FILES:
+    setattr(DataLoader, _name, _LazyTable(_name, derived=False))
+for _name in DERIVED:
+    setattr(DataLoader, _name, _LazyTable(_name, derived=True))
+
+
 # ------------------------------------------------------------------------
 # Instância global — acessível via from src.config import DATA
 # ------------------------------------------------------------------------
 DATA = DataLoader()
-
-# ------------------------------------------------------------------------
-# Tabelas de tetos anuais (compatibilidade com cálculos)
-# ------------------------------------------------------------------------
-ANNUAL_CAPS = {
-    "BR": {"INSS": 908.85 * 13, "FGTS": None},
-    "CL": {"AFP": 81.6 * 12, "CES": 122.6 * 12},
-    "US": {"FICA_SS": 168600, "FICA_MEDICARE": None},
-    "CA": {"CPP": 68500, "EI": 63600},
-    "MX": {"IMSS": 25 * 365},
-}
-
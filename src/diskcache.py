@@ -0,0 +1,185 @@
+"""
+Cache de resultados em disco (SQLite), compartilhado entre processos.
+
+Segunda camada abaixo do LRU em memória de src/cache.py: vários processos
+do servidor (ou réplicas do Streamlit na mesma máquina) leem e gravam no
+mesmo arquivo, então um resultado calculado por um deles serve aos demais,
+inclusive a processos que acabaram de subir. Cada entrada tem validade
+(TTL) e o arquivo tem tamanho máximo: acima dele, as entradas mais antigas
+são descartadas.
+
+Só os resultados caros usam esta camada: curvas de src/sweep.py e soluções
+do gross-up (src/grossup.py). `get_net_salary` e `get_employer_cost` ficam
+só no LRU do processo: uma leitura no SQLite (~18 µs) custa mais que
+recalcular, e NetResult/CostResult não são gravados em JSON. As tabelas
+compiladas também não ficam em memória compartilhada: cada processo lê e
+compila as suas (src/config.py).
+
+Desligado por padrão. Liga com SIMULADOR_SHARED_CACHE=<arquivo .sqlite>;
+SIMULADOR_SHARED_CACHE_TTL (s) e SIMULADOR_SHARED_CACHE_MB ajustam validade
+e tamanho. As chaves já incluem `DATA.table_version`, então tabelas novas
+geram chaves novas e as antigas expiram sozinhas.
+
+Os valores são gravados em JSON (números, textos, listas, dicionários e
+DataFrames por coluna), nunca com pickle: o arquivo é compartilhado, e ler
+um valor dele não pode executar código.
+
+Qualquer erro do SQLite (arquivo bloqueado, disco cheio, corrompido) é
+registrado no log e tratado como ausência no cache: o cálculo segue normal.
+"""
+import hashlib
+import logging
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 3600.0
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+TRIM_EVERY = 128   # gravações entre verificações de tamanho/validade
+CODEC = "json1"    # entra na chave: entradas de outro formato nunca são lidas
+
+_MISSING = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key     BLOB PRIMARY KEY,
+    value   BLOB NOT NULL,
+    size    INTEGER NOT NULL,
+    expires REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires);
+"""
+
+
+# --------------------------------------------------------------------
+# Codificação dos valores (JSON; DataFrames coluna a coluna, com o dtype)
+# --------------------------------------------------------------------
+def _encode(value: Any) -> bytes:
+    pd = sys.modules.get("pandas")   # só há DataFrame para gravar se o pandas já foi importado
+    if pd is not None and isinstance(value, pd.DataFrame):
+        value = {"__frame__": [[str(c), str(value[c].dtype), value[c].tolist()] for c in value.columns]}
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _decode(blob: bytes) -> Any:
+    value = json.loads(blob)
+    if isinstance(value, dict) and "__frame__" in value:
+        import pandas as pd
+
+        return pd.DataFrame({name: pd.Series(data, dtype=dtype) for name, dtype, data in value["__frame__"]})
+    return value
+
+
+class DiskCache:
+    """Mapa persistente com TTL e limite de bytes; seguro entre threads e processos."""
+
+    def __init__(self, path: str, namespace: str = "", ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.namespace = namespace
+        self.ttl = float(ttl)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._local = threading.local()   # uma conexão por thread
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")     # leitores não bloqueiam o gravador
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _key(self, key: Hashable) -> bytes:
+        # repr é estável entre processos para as chaves usadas (tuplas de str/float/int/bool)
+        return hashlib.sha1(f"{CODEC}\0{self.namespace}\0{key!r}".encode("utf-8")).digest()
+
+    def _failed(self, action: str, e: Exception) -> None:
+        self.errors += 1
+        logger.warning("Cache compartilhado (%s): falha ao %s: %s", self.path, action, e)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM entries WHERE key = ? AND expires > ?", (self._key(key), time.time())
+            ).fetchone()
+            value = _decode(row[0]) if row is not None else _MISSING
+        except (sqlite3.Error, OSError, ValueError, TypeError) as e:
+            self._failed("ler", e)
+            value = _MISSING
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        try:
+            blob = _encode(value)
+            if len(blob) > self.max_bytes:
+                return
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO entries (key, value, size, expires) VALUES (?, ?, ?, ?)",
+                         (self._key(key), blob, len(blob), time.time() + self.ttl))
+            self._writes += 1
+            if self._writes % TRIM_EVERY == 0:
+                self.trim()
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            self._failed("gravar", e)
+
+    def trim(self) -> None:
+        """Remove entradas vencidas e, acima de `max_bytes`, as mais antigas."""
+        conn = self._connect()
+        conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        # Descarta pela validade (a mais próxima de vencer = gravada há mais tempo) até ~90% do limite
+        excess = total - int(self.max_bytes * 0.9)
+        cutoff = conn.execute(
+            "SELECT expires FROM (SELECT expires, SUM(size) OVER (ORDER BY expires) AS acc FROM entries) "
+            "WHERE acc >= ? ORDER BY expires LIMIT 1", (excess,)).fetchone()
+        if cutoff is not None:
+            conn.execute("DELETE FROM entries WHERE expires <= ?", (cutoff[0],))
+
+    def clear(self) -> None:
+        try:
+            self._connect().execute("DELETE FROM entries")
+        except sqlite3.Error as e:
+            self._failed("limpar", e)
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            size, count = self._connect().execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries").fetchone()
+        except sqlite3.Error:
+            size = count = None
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "entries": count,
+                "bytes": size, "max_bytes": self.max_bytes, "ttl": self.ttl,
+                "hit_rate": (self.hits / total) if total else 0.0}
+
+
+def shared_cache(namespace: str) -> Optional[DiskCache]:
+    """DiskCache configurado pelo ambiente (SIMULADOR_SHARED_CACHE*); None se desligado."""
+    path = os.environ.get("SIMULADOR_SHARED_CACHE", "")
+    if not path:
+        return None
+    ttl = float(os.environ.get("SIMULADOR_SHARED_CACHE_TTL", DEFAULT_TTL))
+    max_bytes = int(float(os.environ.get("SIMULADOR_SHARED_CACHE_MB", DEFAULT_MAX_BYTES / 2**20)) * 2**20)
+    return DiskCache(path, namespace, ttl, max_bytes)
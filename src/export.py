@@ -0,0 +1,268 @@
+"""
+Exportação dos resultados em Arrow IPC / Parquet, direto dos buffers dos motores.
+
+As colunas calculadas pelos motores em lote (src/batch.py) já são arrays
+float64 contíguos; aqui elas viram arrays do Arrow sem cópia e sem passar
+por strings formatadas. País, moeda (código ISO) e item do detalhamento são
+colunas de dicionário, então cada valor distinto é guardado uma vez.
+
+Tabelas:
+    results_table    uma linha por empregado: entradas, líquido, custo e um valor por encargo
+    breakdown_table  formato longo: (row, country, currency, kind, item, value) por item
+
+Arquivos .arrow/.feather/.ipc são gravados no formato de arquivo IPC, que
+pode ser lido com memory-map (`read_ipc`) sem carregar tudo na memória;
+.parquet/.pq usam Parquet. Requer o pacote opcional 'pyarrow'.
+"""
+import io
+import os
+from typing import Dict, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from src.batch import (all_charge_names, employer_cost_columns, get_employer_cost_batch,
+                       get_net_salary_batch, group_rows, net_salary_columns, _column, _state_rates)
+from src.config import DATA
+from src.registry import date_array
+from src.results import CHARGE_PREFIX, LINE_LABELS, TAX_PREFIX, LineTable
+
+IPC_EXTENSIONS = (".arrow", ".feather", ".ipc")
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+# Colunas de entrada repassadas para a saída (quando presentes)
+EARNING_ITEMS = {"medias_provision"}   # itens do líquido que são proventos
+INPUT_COLUMNS = ("country", "salary_monthly", "dependents", "other_deductions", "bonus_annual",
+                 "incide_medias", "incide_bonus", "state", "reference_date")
+
+
+def available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _pa():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Exportação Arrow/Parquet requer o pacote 'pyarrow'.") from e
+    return pa
+
+
+def export_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in IPC_EXTENSIONS:
+        return "ipc"
+    if ext in PARQUET_EXTENSIONS:
+        return "parquet"
+    raise ValueError(f"Formato de exportação desconhecido: {path} (use .arrow/.feather/.ipc ou .parquet)")
+
+
+# --------------------------------------------------------------------
+# Colunas
+# --------------------------------------------------------------------
+def vocabularies() -> Dict[str, tuple]:
+    """
+    Dicionários fixos por coluna (ordenados). Todos os blocos de um arquivo usam o
+    mesmo dicionário, o que o formato de arquivo IPC exige entre lotes.
+    """
+    items = set(LINE_LABELS) | {CHARGE_PREFIX + name for name in all_charge_names()}
+    items |= {TAX_PREFIX + name for table in DATA.net_rates.values() for name in table.names}
+    return {"country": tuple(sorted(DATA.countries)),
+            "currency": tuple(sorted({"", *DATA.currencies.values()})),
+            "state": tuple(sorted(DATA.us_rates)),
+            "kind": ("charge", "deduction", "earning"),
+            "item": tuple(sorted(items))}
+
+
+def _dictionary(values, vocabulary: Sequence[str]):
+    """
+    Coluna de texto como DictionaryArray (índices int32 sobre `vocabulary`). Vazios e
+    valores fora do vocabulário viram nulo: o tipo da coluna não depende do bloco,
+    então todos os blocos de um arquivo têm o mesmo esquema.
+    """
+    pa = _pa()
+    text = np.asarray(values, dtype=object).astype(str)   # None/NaN viram "None"/"nan": fora do vocabulário
+    vocab = np.asarray(vocabulary, dtype=str)
+    idx = np.minimum(np.searchsorted(vocab, text), max(vocab.size - 1, 0))
+    valid = (vocab[idx] == text) if vocab.size else np.zeros(text.size, dtype=bool)
+    return pa.DictionaryArray.from_arrays(pa.array(idx.astype(np.int32), mask=~valid),
+                                          pa.array(list(vocabulary), pa.string()))
+
+
+def currency_codes(countries) -> np.ndarray:
+    """Código ISO da moeda local de cada linha (DATA.currencies; vazio se o país não tiver)."""
+    countries = np.asarray(countries, dtype=object).astype(str)
+    unique, inverse = np.unique(countries, return_inverse=True)
+    return np.array([DATA.currencies.get(c, "") for c in unique], dtype=object)[inverse]
+
+
+# Tipo fixo de cada coluna de entrada na saída (independe do que o bloco trouxe)
+INPUT_TYPES = {"salary_monthly": np.float64, "dependents": np.float64, "other_deductions": np.float64,
+               "bonus_annual": np.float64, "incide_medias": bool, "incide_bonus": bool}
+
+
+def _input_array(name: str, columns: Mapping, n: int, vocab: Dict[str, tuple]):
+    pa = _pa()
+    if name in ("country", "state"):
+        return _dictionary(columns[name], vocab[name])
+    if name == "reference_date":
+        return pa.array(date_array(columns[name]))   # vazia = nulo (calculada com as tabelas atuais)
+    dtype = INPUT_TYPES[name]
+    # Os mesmos valores usados no cálculo (vazio = padrão da coluna)
+    return pa.array(_column(columns, name, n, dtype, False if dtype is bool else 0))
+
+
+def results_table(columns: Mapping, charge_names: Optional[Sequence[str]] = None):
+    """
+    Tabela Arrow com uma linha por empregado. `columns` segue `net_salary_columns`
+    (dict de arrays ou DataFrame). Valores na moeda local; a coluna `currency` traz o código.
+    """
+    pa = _pa()
+    charge_names = tuple(charge_names) if charge_names is not None else all_charge_names()
+    vocab = vocabularies()
+    n = len(columns["country"])
+    arrays, names = [], []
+    for name in INPUT_COLUMNS:
+        if name in columns:
+            arrays.append(_input_array(name, columns, n, vocab))
+            names.append(name)
+    arrays.insert(1, _dictionary(currency_codes(columns["country"]), vocab["currency"]))
+    names.insert(1, "currency")
+
+    # Colunas calculadas: arrays float64 contíguos dos motores, entregues ao Arrow sem cópia
+    for key, values in net_salary_columns(columns).items():
+        arrays.append(pa.array(values))
+        names.append(key)
+    for key, values in employer_cost_columns(columns, charge_names).items():
+        arrays.append(pa.array(values))
+        names.append(key)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def breakdown_table(columns: Mapping):
+    """
+    Detalhamento em formato longo: uma linha por (empregado, item), com `kind`
+    'earning'/'deduction' (itens do líquido) ou 'charge' (encargos do empregador).
+    """
+    pa = _pa()
+    country = np.asarray(columns["country"], dtype=object)
+    n = country.size
+    salary = _column(columns, "salary_monthly", n)
+    dependents = _column(columns, "dependents", n)
+    other = _column(columns, "other_deductions", n)
+    bonus = _column(columns, "bonus_annual", n)
+    incide_medias = _column(columns, "incide_medias", n, bool, False)
+    incide_bonus = _column(columns, "incide_bonus", n, bool, False)
+    state_rate = _state_rates(columns, n)
+    dates = columns["reference_date"] if "reference_date" in columns else None
+
+    vocab = vocabularies()
+    position = {col: {v: i for i, v in enumerate(values)} for col, values in vocab.items()}
+    parts = []
+    for name, idx, tables in group_rows(country, dates):
+        net = get_net_salary_batch(name, salary[idx], dependents[idx], other[idx], bonus[idx],
+                                   incide_medias[idx], state_rate[idx], tables)
+        cost = get_employer_cost_batch(name, salary[idx], bonus[idx], incide_bonus[idx], tables)
+        for lines in (LineTable.from_net_batch(net), LineTable.from_cost_batch(cost)):
+            items = lines.names()
+            if not items:
+                continue
+            kinds = ["charge" if i.startswith(CHARGE_PREFIX) else
+                     "earning" if i in EARNING_ITEMS else "deduction" for i in items]
+            m = len(items) * idx.size
+            # Índices de dicionário montados direto (sem strings por linha)
+            parts.append({"row": np.tile(idx, len(items)),
+                          "country": np.full(m, position["country"][name], dtype=np.int32),
+                          "currency": np.full(m, position["currency"][DATA.currencies.get(name, "")], dtype=np.int32),
+                          "kind": np.repeat(np.array([position["kind"][k] for k in kinds], dtype=np.int32), idx.size),
+                          "item": np.repeat(np.array([position["item"][i] for i in items], dtype=np.int32), idx.size),
+                          "value": lines.values.ravel()})   # (itens × linhas) já contíguo
+
+    keys = ("row", "country", "currency", "kind", "item", "value")
+    merged = {key: (np.concatenate([p[key] for p in parts]) if parts else
+                    np.empty(0, np.float64 if key == "value" else np.int64 if key == "row" else np.int32))
+              for key in keys}
+    columns = {"row": pa.array(merged["row"].astype(np.int64, copy=False))}
+    for key in ("country", "currency", "kind", "item"):
+        columns[key] = pa.DictionaryArray.from_arrays(pa.array(merged[key]), pa.array(list(vocab[key])))
+    columns["value"] = pa.array(merged["value"])
+    return pa.table(columns)
+
+
+def frame_table(df, currency: Optional[Iterable[str]] = None):
+    """DataFrame numérico (ex.: tabelas das páginas) -> Arrow, com coluna opcional de moeda."""
+    pa = _pa()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if currency is not None:
+        table = table.append_column("currency", _dictionary(list(currency), vocabularies()["currency"]))
+    return table
+
+
+# --------------------------------------------------------------------
+# Gravação / leitura
+# --------------------------------------------------------------------
+class TableWriter:
+    """Grava tabelas Arrow em blocos num arquivo IPC (file format) ou Parquet (row groups)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = export_format(path)
+        self.schema = None
+        self._writer = None
+        self._sink = None
+
+    def write(self, table) -> None:
+        """O esquema do arquivo é o do primeiro bloco; os seguintes são convertidos para ele."""
+        pa = _pa()
+        if self._writer is None:
+            self.schema = table.schema
+            if self.format == "parquet":
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                self._sink = pa.OSFile(self.path, "wb")
+                self._writer = pa.ipc.new_file(self._sink, table.schema)
+        elif not table.schema.equals(self.schema):
+            table = table.cast(self.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_table(table, path: str) -> None:
+    with TableWriter(path) as writer:
+        writer.write(table)
+
+
+def table_bytes(table, fmt: str = "parquet") -> bytes:
+    """Arquivo completo em memória (para download na interface)."""
+    pa = _pa()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        buf = io.BytesIO()
+        pq.write_table(table, buf)
+        return buf.getvalue()
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def read_ipc(path: str):
+    """Lê um arquivo IPC via memory-map: as colunas apontam para as páginas do arquivo."""
+    pa = _pa()
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
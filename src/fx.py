@@ -0,0 +1,112 @@
+"""
+Câmbio a partir de um arquivo local de cotações (sem acesso à rede).
+
+As cotações ficam numa matriz datas × moedas (unidades da moeda por 1 unidade
+da moeda base), com as lacunas preenchidas pela última cotação conhecida.
+A cotação de um par numa data é a da última data publicada até ela
+(bisseção sobre as datas), e `convert` converte colunas inteiras de uma vez:
+moedas e datas de cada linha viram índices e o fator é uma divisão de arrays.
+
+Formatos aceitos:
+    data/fx_rates.json  {"base": "USD", "rates": {"2025-01-02": {"BRL": 6.18, ...}}}
+    CSV (load_fx_csv)   date,currency,rate  (rate = moeda por 1 unidade da base)
+"""
+import csv
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.registry import iso_date
+from src.tables import TableError
+
+
+class FxTable:
+    """Cotações indexadas por (moeda, data), convertidas em lote."""
+
+    def __init__(self, base: str, currencies: Sequence[str], dates: Sequence[str], rates: np.ndarray):
+        self.base = base
+        self.currencies: Tuple[str, ...] = tuple(currencies)
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.rates = rates                  # (datas × moedas), base = 1.0
+        self._index = {code: i for i, code in enumerate(self.currencies)}
+
+    @property
+    def latest_date(self) -> Optional[str]:
+        return str(self.dates[-1]) if self.dates.size else None
+
+    def _currency_index(self, codes) -> np.ndarray:
+        codes = np.asarray(codes, dtype=object)
+        unique, inverse = np.unique(codes, return_inverse=True)
+        missing = [c for c in unique if c not in self._index]
+        if missing:
+            raise KeyError(f"Moeda sem cotação: {', '.join(map(str, missing))}")
+        return np.array([self._index[c] for c in unique], dtype=np.int64)[inverse].reshape(codes.shape)
+
+    def _date_index(self, dates) -> np.ndarray:
+        if dates is None:
+            return np.array(self.dates.size - 1)
+        dates = np.asarray(dates).astype("datetime64[D]")
+        return np.maximum(np.searchsorted(self.dates, dates, side="right") - 1, 0)
+
+    def factors(self, from_ccy, to_ccy, dates=None) -> np.ndarray:
+        """Fator de conversão por linha (escalares ou arrays com broadcast)."""
+        if not self.dates.size:
+            raise KeyError("Tabela de câmbio vazia")
+        d = self._date_index(dates)
+        return self.rates[d, self._currency_index(to_ccy)] / self.rates[d, self._currency_index(from_ccy)]
+
+    def rate(self, from_ccy: str, to_ccy: str, date=None) -> float:
+        return float(self.factors(from_ccy, to_ccy, None if date is None else iso_date(date)))
+
+    def convert(self, amounts, from_ccy, to_ccy, dates=None) -> np.ndarray:
+        """Converte valores de `from_ccy` para `to_ccy` (moedas e datas escalares ou por linha)."""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if np.ndim(from_ccy) == 0 and np.ndim(to_ccy) == 0 and from_ccy == to_ccy:
+            return amounts.copy()
+        return amounts * self.factors(from_ccy, to_ccy, dates)
+
+
+def _build(base: str, quotes: Dict[str, Dict[str, float]], where: str) -> FxTable:
+    """quotes: {data ISO: {moeda: cotação}} -> FxTable com lacunas preenchidas."""
+    dates = sorted(iso_date(d) for d in quotes)
+    by_date = {iso_date(d): q for d, q in quotes.items()}
+    currencies = sorted({base, *(c for q in quotes.values() for c in q)})
+    col = {c: i for i, c in enumerate(currencies)}
+    rates = np.full((len(dates), len(currencies)), np.nan)
+    for i, date in enumerate(dates):
+        for code, value in by_date[date].items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise TableError(f"{where}: cotação inválida de {code} em {date}: {value!r}")
+            rates[i, col[code]] = float(value)
+    rates[:, col[base]] = 1.0
+    # Última cotação conhecida vale até a próxima (forward fill por coluna)
+    for j in range(len(currencies)):
+        column = rates[:, j]
+        known = np.where(~np.isnan(column), np.arange(len(dates)), -1)
+        last = np.maximum.accumulate(known)
+        rates[:, j] = np.where(last >= 0, column[np.maximum(last, 0)], np.nan)
+    return FxTable(base, currencies, dates, rates)
+
+
+def compile_fx(raw: Dict, where: str = "fx_rates.json") -> FxTable:
+    if not isinstance(raw, dict) or not isinstance(raw.get("rates", {}), dict):
+        raise TableError(f"{where}: esperado {{'base': ..., 'rates': {{data: {{moeda: cotação}}}}}}")
+    return _build(str(raw.get("base", "USD")), raw.get("rates", {}), where)
+
+
+def load_fx_csv(path: str, base: str = "USD") -> FxTable:
+    """Lê um CSV date,currency,rate (cotações contra `base`)."""
+    quotes: Dict[str, Dict[str, float]] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                quotes.setdefault(row["date"], {})[row["currency"].strip()] = float(row["rate"])
+            except (KeyError, ValueError) as e:
+                raise TableError(f"{path}: linha inválida {row}") from e
+    return _build(base, quotes, path)
+
+
+def currency_symbol(code: str, countries: Dict[str, Dict], currencies: Dict[str, str]) -> str:
+    """Símbolo exibido para uma moeda: o do primeiro país que a usa, senão o próprio código."""
+    return next((countries[c].get("symbol", code) for c, ccy in currencies.items()
+                 if ccy == code and c in countries), code)
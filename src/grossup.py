@@ -0,0 +1,174 @@
+"""
+Gross-up: salário bruto necessário para atingir um líquido-alvo.
+
+O líquido é contínuo, crescente e linear por partes no bruto. Nos países com
+descontos por faixas (componentes `progressiva` de regras_paises.json, ex:
+INSS e IRRF no Brasil) as quebras vêm das faixas compiladas (src/tables.py):
+o líquido é avaliado só nesses pontos e a inversa sai por interpolação
+linear, que é exata dentro de cada trecho. Para os demais países (e como
+rede de segurança) há uma bisseção vetorizada sobre os motores de src/batch.py.
+
+Todas as funções recebem arrays de alvos, então uma planilha inteira de
+propostas é resolvida de uma vez.
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.batch import _as_array, get_net_salary_batch
+from src.cache import LRUCache, memoize
+from src.config import DATA, RESULT_CACHE_SIZE
+from src.diskcache import shared_cache
+from src.instrument import timed
+from src.rules import Progressive
+
+TOLERANCE = 0.005   # erro máximo aceito no líquido (meio centavo)
+MAX_ITER = 100
+KNOT_EPS = 1e-4     # distância (em bruto) dos pontos avaliados em volta de cada quebra
+
+
+def _net(country: str, gross: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    return get_net_salary_batch(country, gross, **params)["net_salary"]
+
+
+# --- FAIXAS PROGRESSIVAS (inversão exata por trechos) ---
+def _table_knots(table, shift: float = 0.0) -> np.ndarray:
+    """Limites e pontos em que o valor da faixa cruza zero (max(..., 0)), deslocados."""
+    limits = np.asarray(table.limits, dtype=np.float64)
+    rates = np.asarray(table.rates, dtype=np.float64)
+    offsets = np.asarray(table.offsets, dtype=np.float64)
+    zeros = -offsets[rates > 0] / rates[rates > 0]
+    return np.concatenate((limits, zeros[zeros > 0])) + shift
+
+
+def _gross_knots(country: str, tables, params: Dict[str, float], upper: float) -> np.ndarray:
+    """Quebras do líquido do país, em valores de salário bruto, componente a componente."""
+    knots = np.array([0.0, upper])
+    for component in DATA.rules.get(country).components:
+        if not isinstance(component, Progressive):
+            continue
+        table, per_dependent = component.bracket(tables)
+        if table is None:
+            continue
+        # Base da faixa nos pontos já conhecidos: bruto menos os componentes deduzidos,
+        # crescente e linear por partes entre eles
+        values = get_net_salary_batch(country, knots, tables=tables, **params)
+        base_at_knots = knots - sum((values[key] for key in component.minus), np.zeros_like(knots))
+        bases = _table_knots(table, per_dependent * params["dependents"])
+        knots = np.unique(np.concatenate((knots, np.interp(bases, base_at_knots, knots))))
+    return knots[(knots >= 0.0) & (knots <= upper)]
+
+
+def _invert_piecewise(x: np.ndarray, y: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Inversa de uma função linear por partes dada pelos pontos (x, y).
+    O trecho é escolhido pela envoltória crescente de y, mas a interpolação usa
+    os valores originais das pontas, então saltos negativos nos limites não
+    distorcem os trechos vizinhos.
+    """
+    j = np.clip(np.searchsorted(np.maximum.accumulate(y), targets, side="right") - 1, 0, x.size - 2)
+    x0, x1, y0, y1 = x[j], x[j + 1], y[j], y[j + 1]
+    rising = y1 > y0
+    frac = np.where(rising, (targets - y0) / np.where(rising, y1 - y0, 1.0), 1.0)
+    return x0 + np.clip(frac, 0.0, 1.0) * (x1 - x0)
+
+
+def _gross_up_piecewise(country: str, target: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    n = target.size
+    zeros = np.zeros(n)
+    tables = DATA.registry.base(country)
+    # Médias e outras deduções só deslocam o líquido: resolve para a parte que depende do bruto
+    offset = _net(country, zeros, params)
+    core_target = target - offset
+    upper = max(float(core_target.max(initial=0.0)) * 2.0 + 1e5, 1e5)
+
+    gross = np.zeros(n)
+    # Dependentes e alíquota estadual mudam as quebras/inclinação: um conjunto de pontos por grupo
+    groups = np.stack((params["dependents"], params["state_rate"]), axis=1)
+    for dep, rate in np.unique(groups, axis=0):
+        rows = np.flatnonzero((params["dependents"] == dep) & (params["state_rate"] == rate))
+        group = {"dependents": float(dep), "state_rate": float(rate)}
+        knots = _gross_knots(country, tables, group, upper)
+        # Avalia dos dois lados de cada quebra: a tabela do IRRF tem saltos de
+        # frações de centavo nos limites (parcela a deduzir arredondada)
+        knots = np.unique(np.concatenate(([0.0], knots - KNOT_EPS, knots + KNOT_EPS)))
+        knots = knots[knots >= 0.0]
+        core_at_knots = get_net_salary_batch(country, knots, tables=tables, **group)["net_salary"]
+        gross[rows] = _invert_piecewise(knots, core_at_knots, core_target[rows])
+    return gross
+
+
+# --- GENÉRICO (bisseção vetorizada) ---
+def bisect_gross(country: str, target: np.ndarray, params: Dict[str, np.ndarray],
+                 lo: Optional[np.ndarray] = None, hi: Optional[np.ndarray] = None,
+                 tol: float = TOLERANCE) -> np.ndarray:
+    """Bisseção simultânea para todos os alvos, usando o motor em lote do país."""
+    n = target.size
+    lo = np.zeros(n) if lo is None else lo.copy()
+    hi = np.maximum(target, 1.0) * 2.0 if hi is None else hi.copy()
+    # Amplia o limite superior até cobrir todos os alvos
+    for _ in range(64):
+        short = _net(country, hi, params) < target
+        if not short.any():
+            break
+        hi = np.where(short, hi * 2.0, hi)
+
+    for _ in range(MAX_ITER):
+        mid = (lo + hi) / 2.0
+        below = _net(country, mid, params) < target
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+        if np.all(hi - lo <= tol * 1e-3):
+            break
+    return hi
+
+
+# --- FACHADA ---
+def gross_from_net(country: str, target_net, dependents=None, other_deductions=None,
+                   bonus_annual=None, incide_medias=None, state_rate=None) -> np.ndarray:
+    """
+    Salário bruto mensal que produz `target_net` de líquido (inversa de
+    `get_net_salary`). Aceita escalar ou arrays, como os motores em lote.
+    Alvos abaixo do líquido de um bruto zero retornam 0.
+    """
+    target = np.atleast_1d(np.asarray(target_net, dtype=np.float64))
+    n = target.size
+    params = {"dependents": _as_array(dependents, n), "other_deductions": _as_array(other_deductions, n),
+              "bonus_annual": _as_array(bonus_annual, n),
+              "incide_medias": np.broadcast_to(np.asarray(bool(incide_medias) if np.ndim(incide_medias) == 0
+                                                          else incide_medias, dtype=bool), (n,)),
+              "state_rate": _as_array(state_rate, n)}
+
+    if DATA.rules.get(country).progressive:
+        gross = _gross_up_piecewise(country, target, params)
+    else:
+        gross = bisect_gross(country, target, params)
+
+    # Confere o resultado; trechos não previstos (ex: teto atingido) caem na bisseção
+    floor = _net(country, np.zeros(n), params)
+    gross = np.where(target <= floor, 0.0, gross)
+    miss = np.flatnonzero(np.abs(_net(country, gross, params) - target) > TOLERANCE)
+    miss = miss[target[miss] > floor[miss]]
+    if miss.size:
+        sub = {key: value[miss] for key, value in params.items()}
+        gross[miss] = bisect_gross(country, target[miss], sub)
+    return gross
+
+
+# Cada solução custa ~1 ms: LRU do processo + cache em disco compartilhado (se configurado)
+GROSS_CACHE = LRUCache(RESULT_CACHE_SIZE)
+GROSS_SHARED = shared_cache("gross")
+
+
+def _gross_key(country: str, target_net: float, **kwargs) -> Tuple:
+    return (country, float(target_net), int(kwargs.get('dependents') or 0),
+            float(kwargs.get('other_deductions') or 0), float(kwargs.get('bonus_annual') or 0),
+            bool(kwargs.get('incide_medias', False)), float(kwargs.get('state_rate') or 0.0), DATA.table_version)
+
+
+@timed("grossup.solve_gross")
+@memoize(GROSS_CACHE, _gross_key, GROSS_SHARED)
+def solve_gross(country: str, target_net: float, **kwargs) -> float:
+    """Versão escalar de `gross_from_net` (mesmos parâmetros de `get_net_salary`)."""
+    kwargs.pop("state_name", None)
+    return float(gross_from_net(country, target_net, **kwargs)[0])
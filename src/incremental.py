@@ -0,0 +1,113 @@
+"""
+Recálculo incremental: grafo de dependências que só refaz o que mudou.
+
+Cada nó é uma função com entradas nomeadas (valores vindos da página) e
+dependências (outros nós). O resultado de um nó fica guardado junto com a
+assinatura que o produziu: valores das entradas, carimbos das dependências
+e `DATA.table_version`. Numa nova avaliação, um nó cuja assinatura não mudou
+devolve o valor guardado sem chamar a função; quando ele é recalculado,
+ganha um carimbo novo e só os nós que dependem dele são refeitos.
+
+Os resultados ficam separados por `scope` (ex.: o país): trocar de país e
+voltar, ou acrescentar um país numa comparação, reaproveita o que já foi
+calculado para os demais. Fragmentos já renderizados (HTML, linhas
+formatadas) podem ser nós também.
+
+    graph = Graph()
+
+    @graph.node(inputs=("country", "salary"))
+    def net(country, salary): ...
+
+    @graph.node(inputs=("sym",), deps=("net",))
+    def table_html(net, sym): ...
+
+    values = graph.evaluate(["table_html"], {"country": c, "salary": s, "sym": "R$"}, scope=c)
+"""
+import itertools
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+from src.config import DATA
+
+DEFAULT_MAX_ENTRIES = 512   # resultados guardados (nó × scope) por grafo
+
+
+class _Node:
+    __slots__ = ("name", "func", "inputs", "deps")
+
+    def __init__(self, name: str, func: Callable, inputs: Tuple[str, ...], deps: Tuple[str, ...]):
+        self.name, self.func, self.inputs, self.deps = name, func, inputs, deps
+
+
+class Graph:
+    """Nós nomeados com entradas e dependências; resultados guardados por (scope, nó)."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.computed = 0
+        self.reused = 0
+        self._nodes: Dict[str, _Node] = {}
+        # (scope, nó) -> (assinatura, carimbo, valor), do menos para o mais recente
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[Tuple, int, Any]]" = OrderedDict()
+        self._stamps = itertools.count(1)
+
+    def node(self, inputs: Sequence[str] = (), deps: Sequence[str] = (), name: Optional[str] = None):
+        """Decorador que registra `func(**deps, **inputs)` como nó (nome = nome da função)."""
+        def decorator(func):
+            key = name or func.__name__
+            missing = [d for d in deps if d not in self._nodes]
+            if missing:
+                raise ValueError(f"Nó '{key}' depende de nós não registrados: {', '.join(missing)}")
+            self._nodes[key] = _Node(key, func, tuple(inputs), tuple(deps))
+            return func
+        return decorator
+
+    def evaluate(self, targets: Iterable[str], inputs: Dict[str, Hashable],
+                 scope: Hashable = None) -> Dict[str, Any]:
+        """Valores dos nós pedidos (e de suas dependências), recalculando só os que mudaram."""
+        version = DATA.table_version
+        done: Dict[str, Tuple[int, Any]] = {}
+        for target in targets:
+            self._evaluate(target, inputs, scope, version, done)
+        return {name: value for name, (_, value) in done.items()}
+
+    def _evaluate(self, name: str, inputs: Dict, scope: Hashable, version, done: Dict) -> Tuple[int, Any]:
+        if name in done:
+            return done[name]
+        node = self._nodes[name]
+        deps = [self._evaluate(dep, inputs, scope, version, done) for dep in node.deps]
+        try:
+            signature = (version, tuple(inputs[i] for i in node.inputs), tuple(stamp for stamp, _ in deps))
+        except KeyError as e:
+            raise KeyError(f"Entrada ausente para o nó '{name}': {e.args[0]}") from None
+
+        key = (scope, name)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            self._entries.move_to_end(key)
+            self.reused += 1
+            done[name] = entry[1], entry[2]
+            return done[name]
+
+        kwargs = {dep: value for dep, (_, value) in zip(node.deps, deps)}
+        kwargs.update((i, inputs[i]) for i in node.inputs)
+        value = node.func(**kwargs)
+        stamp = next(self._stamps)
+        self._entries[key] = (signature, stamp, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.computed += 1
+        done[name] = stamp, value
+        return done[name]
+
+    def invalidate(self, scope: Hashable = None) -> None:
+        """Descarta os resultados guardados (todos, ou só os de `scope`)."""
+        if scope is None:
+            self._entries.clear()
+        else:
+            for key in [k for k in self._entries if k[0] == scope]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"computed": self.computed, "reused": self.reused, "entries": len(self._entries)}
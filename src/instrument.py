@@ -0,0 +1,197 @@
+"""
+Instrumentação opcional: tempos e contagens por função e por reexecução.
+
+Desligada por padrão. Liga com a variável de ambiente SIMULADOR_PROFILE=1.
+Os pontos medidos são marcados com `@timed("nome")` (motores de cálculo,
+carga de dados, formatação) e `with span("nome")` (renderização das páginas).
+Sem a variável, `timed` devolve a própria função (custo zero, nem uma chamada
+a mais) e `span` devolve um contexto nulo compartilhado. `enable()` liga e
+desliga em tempo de execução só o que já foi decorado com a instrumentação
+ativa (spans, e funções importadas com SIMULADOR_PROFILE=1).
+
+Cada reexecução do Streamlit fica entre `begin_run()` e `end_run()`; ao
+final, `breakdown()` devolve (nome, chamadas, total ms) ordenado pelo tempo,
+mostrado na sidebar.
+Os tempos são inclusivos: uma função medida dentro de outra aparece nas duas.
+O registro é por thread (cada sessão do Streamlit roda na sua), e os totais
+acumulados do processo ficam em `totals()`.
+
+`profile()` captura um perfil completo (cProfile, ou pyinstrument se estiver
+instalado) do bloco e devolve o relatório em texto.
+"""
+import contextlib
+import functools
+import io
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+_enabled = os.environ.get("SIMULADOR_PROFILE", "").lower() in ("1", "true", "yes", "on")
+_local = threading.local()
+_totals: Dict[str, List[float]] = {}    # nome -> [chamadas, segundos] (processo inteiro)
+_totals_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(flag: bool = True) -> None:
+    global _enabled
+    _enabled = bool(flag)
+
+
+def _record(name: str, seconds: float) -> None:
+    stats = getattr(_local, "stats", None)
+    if stats is not None:
+        entry = stats.get(name)
+        if entry is None:
+            stats[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+    with _totals_lock:
+        entry = _totals.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+# --------------------------------------------------------------------
+# Pontos de medição
+# --------------------------------------------------------------------
+def timed(name: str) -> Callable:
+    """Decorador: soma tempo e chamadas de `func` em `name` quando a instrumentação está ligada."""
+    def decorator(func):
+        if not _enabled:
+            return func
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+_NULL = contextlib.nullcontext()
+
+
+def span(name: str):
+    """Contexto que mede um bloco (ex.: renderização de uma página)."""
+    return _Span(name) if _enabled else _NULL
+
+
+# --------------------------------------------------------------------
+# Reexecução (um script run do Streamlit)
+# --------------------------------------------------------------------
+def begin_run() -> None:
+    """Início de uma reexecução: zera o registro desta thread."""
+    _local.stats = {} if _enabled else None
+    _local.started = time.perf_counter()
+
+
+def end_run(name: str = "rerun") -> None:
+    """Fim da reexecução: registra o tempo total em `name` (o registro vale até o próximo begin_run)."""
+    if _enabled and getattr(_local, "stats", None) is not None:
+        _record(name, time.perf_counter() - _local.started)
+
+
+@contextlib.contextmanager
+def run(name: str = "rerun"):
+    """`begin_run` + `end_run` em volta de um bloco."""
+    begin_run()
+    try:
+        yield
+    finally:
+        end_run(name)
+
+
+def breakdown() -> List[Tuple[str, int, float]]:
+    """(nome, chamadas, total em ms) do último run desta thread, do mais lento para o mais rápido."""
+    stats = getattr(_local, "stats", None) or {}
+    return sorted(((name, int(c), s * 1000.0) for name, (c, s) in stats.items()), key=lambda r: -r[2])
+
+
+def totals() -> Dict[str, Dict[str, float]]:
+    with _totals_lock:
+        return {name: {"calls": int(c), "total_ms": s * 1000.0} for name, (c, s) in _totals.items()}
+
+
+def reset() -> None:
+    with _totals_lock:
+        _totals.clear()
+    _local.stats = None
+
+
+# --------------------------------------------------------------------
+# Perfil completo
+# --------------------------------------------------------------------
+class Profile:
+    """Resultado de `profile()`: `report` (texto) fica disponível ao sair do bloco."""
+
+    def __init__(self, engine: str):
+        self.engine = engine
+        self.report = ""
+
+
+@contextlib.contextmanager
+def profile(engine: str = "cprofile", limit: int = 30):
+    """
+    Perfila o bloco com cProfile (padrão) ou pyinstrument (`engine="pyinstrument"`,
+    se o pacote estiver instalado; senão cai para cProfile).
+    """
+    if engine == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            engine = "cprofile"
+    result = Profile(engine)
+    if engine == "pyinstrument":
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield result
+        finally:
+            profiler.stop()
+            result.report = profiler.output_text(unicode=True, color=False)
+        return
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        result.report = out.getvalue()
+
+
+def format_breakdown(rows: Optional[List[Tuple[str, int, float]]] = None, top: int = 12) -> str:
+    """Tabela em texto simples (nome, chamadas, ms) para exibição/log."""
+    rows = breakdown() if rows is None else rows
+    width = max((len(name) for name, _, _ in rows[:top]), default=0)
+    return "\n".join(f"{name:<{width}}  {calls:>6}×  {ms:9.2f} ms" for name, calls, ms in rows[:top])
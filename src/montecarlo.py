@@ -0,0 +1,195 @@
+"""
+Simulação Monte Carlo do pagamento de STI para planejamento de orçamento.
+
+Cada sorteio é um ano possível: um fator de desempenho da empresa (comum a
+todos) multiplicado por um fator individual por empregado, amostrados das
+distribuições configuradas. O bônus de cada empregado é
+
+    salário mensal × REMUN_MONTHS × target STI × multiplicador
+
+com o target vindo das faixas de sti_config.json (ponto médio da área/nível)
+ou de uma coluna `sti_target`. Os bônus sorteados passam pelos motores em
+lote de líquido e custo empregador e são somados por país, gerando uma
+distribuição de orçamento da qual saem os percentis.
+
+O cálculo é feito em blocos de (sorteios × empregados) com no máximo
+`chunk_elements` posições, então a memória não depende do número de
+sorteios × empregados (só guarda um total por sorteio e país). O mesmo
+`seed` com os mesmos argumentos reproduz o resultado, qualquer que seja o
+tamanho dos blocos.
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from src.batch import get_employer_cost_batch, get_net_salary_batch
+from src.config import DATA
+from src.instrument import timed
+
+DEFAULT_DRAWS = 10_000
+DEFAULT_CHUNK_ELEMENTS = 2_000_000
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+MAX_MULTIPLIER = 2.0   # pagamento máximo: 200% do target
+
+# Distribuições padrão dos fatores de desempenho (ver `sample`)
+DEFAULT_DISTRIBUTIONS = {
+    "company": {"kind": "normal", "mean": 1.0, "std": 0.15, "min": 0.0, "max": 1.5},
+    "individual": {"kind": "normal", "mean": 1.0, "std": 0.25, "min": 0.0, "max": MAX_MULTIPLIER},
+    # "areas": {"Sales": {"kind": "triangular", "left": 0.0, "mode": 1.0, "right": 2.0}},
+}
+
+# Métricas somadas por país em cada sorteio
+METRICS = ("bonus", "net_bonus", "employer_cost")
+
+
+def sample(rng: np.random.Generator, spec: Dict, size) -> np.ndarray:
+    """
+    Amostra uma distribuição descrita por `spec`:
+    normal (mean, std), lognormal (mean, sigma), uniform (low, high),
+    triangular (left, mode, right), beta (a, b, low, high) ou constant (value).
+    'min'/'max' opcionais limitam o resultado.
+    """
+    kind = spec.get("kind", "normal")
+    if kind == "normal":
+        values = rng.normal(spec.get("mean", 1.0), spec.get("std", 0.0), size)
+    elif kind == "lognormal":
+        values = rng.lognormal(spec.get("mean", 0.0), spec.get("sigma", 0.0), size)
+    elif kind == "uniform":
+        values = rng.uniform(spec.get("low", 0.0), spec.get("high", 1.0), size)
+    elif kind == "triangular":
+        values = rng.triangular(spec.get("left", 0.0), spec.get("mode", 1.0), spec.get("right", 2.0), size)
+    elif kind == "beta":
+        low, high = spec.get("low", 0.0), spec.get("high", 1.0)
+        values = low + (high - low) * rng.beta(spec.get("a", 2.0), spec.get("b", 2.0), size)
+    elif kind == "constant":
+        values = np.full(size, float(spec.get("value", 1.0)))
+    else:
+        raise ValueError(f"Distribuição desconhecida: {kind}")
+    if "min" in spec or "max" in spec:
+        values = np.clip(values, spec.get("min", -np.inf), spec.get("max", np.inf))
+    return values
+
+
+def sti_targets(areas, levels, overrides=None) -> np.ndarray:
+    """
+    Target STI por empregado: ponto médio da faixa da área/nível, ou `overrides`
+    quando informado. Área/nível fora de sti_config.json sem `overrides` na linha
+    levanta ValueError (um target 0% sumiria com o bônus do orçamento).
+    """
+    ranges = DATA.STI_RANGES
+    mid = {(a, l): (lo + hi) / 2.0 for a, lv in ranges.items() for l, (lo, hi) in lv.items()}
+    targets = np.array([mid.get((a, l), np.nan) for a, l in zip(areas, levels)], dtype=np.float64)
+    if overrides is not None:
+        overrides = np.asarray(overrides, dtype=np.float64)
+        targets = np.where(np.isnan(overrides), targets, overrides)
+    unknown = np.flatnonzero(np.isnan(targets))
+    if unknown.size:
+        pairs = dict.fromkeys((areas[i], levels[i]) for i in unknown.tolist())
+        raise ValueError(f"{unknown.size} empregado(s) com área/nível de STI não cadastrados em sti_config.json: "
+                         f"{', '.join(f'{a!r}/{l!r}' for a, l in list(pairs)[:5])} "
+                         "(corrija sti_area/sti_level ou informe sti_target na linha)")
+    return targets
+
+
+def _simulate_country(country: str, seed: np.random.SeedSequence, draws: int, cols: Dict[str, np.ndarray],
+                      distributions: Dict, chunk_elements: int) -> Dict[str, np.ndarray]:
+    """Totais por sorteio (um array de `draws` por métrica) para os empregados de um país."""
+    n = cols["salary"].size
+    salary, target, area = cols["salary"], cols["target"], cols["area"]
+    annual_base = salary * DATA.remun_months.get(country, 12.0)
+    net_params = {"dependents": cols["dependents"], "other_deductions": cols["other"],
+                  "state_rate": cols["state_rate"]}
+    base_net = get_net_salary_batch(country, salary, **net_params)["net_salary"]
+    base_cost = get_employer_cost_batch(country, salary, 0.0, cols["incide_bonus"])["total_cost"]
+
+    # Empregados agrupados pela distribuição individual da sua área
+    area_specs = distributions.get("areas", {})
+    groups = {}
+    for name in np.unique(area):
+        spec = area_specs.get(name, distributions["individual"])
+        groups.setdefault(id(spec), (spec, []))[1].append(name)
+    groups = [(spec, np.isin(area, names)) for spec, names in groups.values()]
+    # Um gerador por fator: os sorteios não dependem do tamanho dos blocos
+    company_rng, *group_rngs = (np.random.default_rng(s) for s in seed.spawn(1 + len(groups)))
+
+    totals = {metric: np.empty(draws) for metric in METRICS}
+    step = max(chunk_elements // max(n, 1), 1)
+    for start in range(0, draws, step):
+        d = min(step, draws - start)
+        company = sample(company_rng, distributions["company"], (d, 1))
+        individual = np.empty((d, n))
+        for (spec, mask), rng in zip(groups, group_rngs):
+            individual[:, mask] = sample(rng, spec, (d, int(mask.sum())))
+        multiplier = np.clip(company * individual, 0.0, MAX_MULTIPLIER)
+        bonus = annual_base * target * multiplier
+
+        # Bônus pago numa folha: líquido adicional = líquido(salário + bônus) - líquido(salário)
+        flat = {key: np.broadcast_to(value, (d, n)).ravel() for key, value in net_params.items()}
+        net = get_net_salary_batch(country, (salary + bonus).ravel(), **flat)["net_salary"].reshape(d, n)
+        cost = get_employer_cost_batch(country, np.broadcast_to(salary, (d, n)).ravel(), bonus.ravel(),
+                                       np.broadcast_to(cols["incide_bonus"], (d, n)).ravel())["total_cost"]
+
+        totals["bonus"][start:start + d] = bonus.sum(axis=1)
+        totals["net_bonus"][start:start + d] = (net - base_net).sum(axis=1)
+        totals["employer_cost"][start:start + d] = (cost.reshape(d, n) - base_cost).sum(axis=1)
+    return totals
+
+
+@timed("montecarlo.simulate_sti_budget")
+def simulate_sti_budget(employees, draws: int = DEFAULT_DRAWS, seed: Optional[int] = None,
+                        distributions: Optional[Dict] = None,
+                        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                        chunk_elements: int = DEFAULT_CHUNK_ELEMENTS, return_draws: bool = False):
+    """
+    Percentis do orçamento de STI por país.
+
+    `employees` é um DataFrame com country, salary_monthly, sti_area e sti_level
+    (obrigatórias) e, opcionalmente, sti_target, dependents, other_deductions,
+    incide_bonus e state. `distributions` segue DEFAULT_DISTRIBUTIONS.
+
+    Retorna um DataFrame (country, metric, mean, p5, p25, ...) com as métricas
+    bonus (bruto pago), net_bonus (líquido adicional dos empregados) e
+    employer_cost (bônus + encargos sobre ele), em moeda local de cada país.
+    Com `return_draws=True` devolve também {país: {métrica: totais por sorteio}}.
+    Área/nível sem faixa em sti_config.json (e sem sti_target) levanta ValueError.
+    """
+    import pandas as pd
+
+    missing = [col for col in ("country", "salary_monthly", "sti_area", "sti_level") if col not in employees]
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+    distributions = {**DEFAULT_DISTRIBUTIONS, **(distributions or {})}
+    n = len(employees)
+
+    def column(name, dtype=np.float64):
+        return employees[name].to_numpy(dtype=dtype) if name in employees else np.zeros(n, dtype=dtype)
+
+    cols = {
+        "salary": column("salary_monthly"),
+        "target": sti_targets(employees["sti_area"].to_numpy(dtype=object),
+                              employees["sti_level"].to_numpy(dtype=object),
+                              employees["sti_target"] if "sti_target" in employees else None),
+        "area": employees["sti_area"].to_numpy(dtype=object).astype(str),
+        "dependents": column("dependents"),
+        "other": column("other_deductions"),
+        "incide_bonus": column("incide_bonus", bool),
+        "state_rate": (employees["state"].map(DATA.us_rates).fillna(0.0).to_numpy(dtype=np.float64)
+                       if "state" in employees else np.zeros(n)),
+    }
+
+    # Um gerador independente por país: adicionar um país não muda os sorteios dos outros
+    by_country = employees.groupby("country", sort=True).indices
+    streams = np.random.SeedSequence(seed).spawn(len(by_country))
+    results, rows = {}, []
+    for (country, idx), stream in zip(by_country.items(), streams):
+        sub = {key: value[idx] for key, value in cols.items()}
+        totals = _simulate_country(country, stream, draws, sub,
+                                   distributions, chunk_elements)
+        results[country] = totals
+        for metric, values in totals.items():
+            row = {"country": country, "metric": metric, "mean": float(values.mean())}
+            row.update({f"p{p:g}": float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))})
+            rows.append(row)
+
+    summary = pd.DataFrame(rows)
+    return (summary, results) if return_draws else summary
@@ -0,0 +1,219 @@
+"""
+Projeção anual mês a mês da folha (12 competências + eventos extras).
+
+O líquido mensal (src/rules.py) aproxima 13º e férias pela provisão `medias_prov` e
+`get_employer_cost` multiplica por um fator fixo de meses. Aqui cada evento
+de pagamento é lançado na sua competência:
+
+- salário mensal (12x) e outras deduções;
+- adicional de férias (1/3) no mês de férias;
+- bônus anual no mês de pagamento;
+- 13º: nos países com provisão de médias (`provisao_bonus` em
+  regras_paises.json, ex: Brasil), 1ª parcela em novembro sem descontos e
+  2ª em dezembro; nos demais, aguinaldo/prima ((REMUN_MONTHS - 12) salários,
+  pagos em dezembro).
+
+Os descontos seguem os componentes do país (src/rules.py): faixas
+progressivas incidem sobre a folha de cada mês, com o 13º tributado à parte
+(exclusivo, descontado em dezembro); os demais componentes incidem sobre o
+bruto do mês. Os tetos anuais (`teto_anual` das alíquotas, ex: FICA Social
+Security, e os tetos dos encargos em EMPLOYER_COST) são consumidos em
+ordem: a base acumulada no ano é limitada ao teto e a base de cada mês é a
+diferença dos acumulados.
+
+Todas as grandezas são matrizes (empregados × 12 meses), então a projeção da
+empresa inteira é feita com operações de array, sem laços por empregado.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.batch import _column
+from src.config import DATA
+from src.instrument import timed
+from src.rules import BonusProvision, CountryRules, FlatRate, NetInputs, Progressive, _as_array
+
+MONTHS = 12
+MONTH_INDEX = np.arange(1, MONTHS + 1)
+DEFAULT_BONUS_MONTH = 3
+DEFAULT_VACATION_MONTH = 1
+THIRTEENTH_FIRST_MONTH = 11   # 1ª parcela do 13º (sem descontos), países com provisão de médias
+
+
+def _ytd_capped(base: np.ndarray, cap: Optional[float]) -> np.ndarray:
+    """Base mensal após consumir um teto anual: diferença dos acumulados limitados ao teto."""
+    if cap is None:
+        return base
+    capped = np.minimum(np.cumsum(base, axis=1), cap)
+    return np.diff(capped, axis=1, prepend=0.0)
+
+
+def _month_mask(month, n: int) -> np.ndarray:
+    """Matriz booleana (n × 12) com o mês escolhido (escalar ou array por empregado)."""
+    month = np.broadcast_to(np.asarray(month, dtype=np.int64), (n,))
+    return month[:, None] == MONTH_INDEX[None, :]
+
+
+def _earnings(country: str, provision: Optional[BonusProvision], salary: np.ndarray, bonus: np.ndarray,
+              incide_medias: np.ndarray, bonus_month, vacation_month) -> Dict[str, np.ndarray]:
+    """Proventos por evento, cada um uma matriz (n × 12)."""
+    n = salary.size
+    monthly = np.repeat(salary[:, None], MONTHS, axis=1)
+    bonus_paid = np.where(_month_mask(bonus_month, n), bonus[:, None], 0.0)
+    vacation = np.zeros((n, MONTHS))
+    thirteenth = np.zeros((n, MONTHS))
+
+    if provision is not None:
+        # Médias do bônus entram no 13º (B/12) e nas férias (B/12 + 1/3)
+        avg = np.where(incide_medias, bonus / 12.0, 0.0)
+        if provision.vacation_third:
+            vacation = np.where(_month_mask(vacation_month, n), ((salary + avg) / 3.0)[:, None], 0.0)
+        thirteenth[:, THIRTEENTH_FIRST_MONTH - 1] = (salary + avg) / 2.0
+        thirteenth[:, MONTHS - 1] = (salary + avg) / 2.0
+    else:
+        extra_months = max(DATA.remun_months.get(country, 12.0) - 12.0, 0.0)
+        thirteenth[:, MONTHS - 1] = salary * extra_months
+
+    return {"salary": monthly, "vacation_bonus": vacation, "bonus": bonus_paid, "thirteenth": thirteenth}
+
+
+# --- DESCONTOS DO EMPREGADO ---
+def _monthly_columns(component, x: NetInputs, values: Dict, tables):
+    # Alíquota com teto anual: o teto é consumido ao longo do ano, não mês a mês
+    if isinstance(component, FlatRate) and component.annual_cap and tables is not None:
+        return [(component.key, _ytd_capped(x.salary, tables.cap(component.annual_cap)) * component.rate)]
+    return component.columns(x, values, tables)
+
+
+def _deductions(rules: CountryRules, tables, earn: Dict[str, np.ndarray], gross: np.ndarray,
+                dependents: np.ndarray, state_rate: np.ndarray) -> Dict[str, np.ndarray]:
+    x = NetInputs(gross, dependents[:, None], state_rate=state_rate[:, None])
+    # Faixas: folha mensal (salário + férias + bônus) e 13º exclusivo sobre o valor total
+    regular = x._replace(salary=earn["salary"] + earn["vacation_bonus"] + earn["bonus"])
+    thirteenth = NetInputs(earn["thirteenth"].sum(axis=1), dependents, state_rate=state_rate)
+    values: Dict[str, np.ndarray] = {}
+    values_13: Dict[str, np.ndarray] = {}
+    for component in rules.components:
+        if component.earning:
+            continue   # provisões viram os eventos de _earnings
+        if isinstance(component, Progressive):
+            values.update(component.columns(regular, values, tables))
+            values_13.update(component.columns(thirteenth, values_13, tables))
+        else:
+            values.update(_monthly_columns(component, x, values, tables))
+    for key, value in values_13.items():
+        values[key] = values[key].copy()
+        values[key][:, MONTHS - 1] += value
+    return values
+
+
+# --- ENCARGOS DO EMPREGADOR ---
+def _employer_charges(country: str, earn: Dict[str, np.ndarray],
+                      incide_bonus: np.ndarray) -> Dict[str, np.ndarray]:
+    table = DATA.employer_charges.get(country)
+    if table is None:
+        return {}
+    on_vacation = table.on_vacation or (False,) * len(table.names)
+    on_thirteenth = table.on_thirteenth or (False,) * len(table.names)
+    bonus = np.where(incide_bonus[:, None], earn["bonus"], 0.0)
+
+    charges = {}
+    for name, rate, cap, b, v, t in zip(table.names, table.rates, table.caps,
+                                        table.on_bonus, on_vacation, on_thirteenth):
+        base = earn["salary"].copy()
+        if b:
+            base += bonus
+        if v:
+            base += earn["vacation_bonus"]
+        if t:
+            base += earn["thirteenth"]
+        # Teto do encargo é anual: consumido mês a mês
+        charges[name] = _ytd_capped(base, cap) * rate
+    return charges
+
+
+# --- FACHADA ---
+@timed("projection.project_year")
+def project_year(country: str, salary, dependents=None, other_deductions=None,
+                 bonus_annual=None, incide_medias=None, incide_bonus=None,
+                 state_rate=None, bonus_month=DEFAULT_BONUS_MONTH,
+                 vacation_month=DEFAULT_VACATION_MONTH) -> Dict:
+    """
+    Projeção anual de um país, com um empregado por posição dos arrays.
+    Parâmetros aceitam escalar (aplicado a todos) ou array; `bonus_month` e
+    `vacation_month` são meses 1-12.
+
+    Retorna matrizes (n × 12): 'earnings' e 'deductions' (dicts por evento /
+    desconto), 'gross', 'total_deductions', 'net', 'charges' (dict por encargo),
+    'total_charges' e 'employer_cost'; além de 'ytd_gross' e 'ytd_net' acumulados.
+    """
+    salary = np.atleast_1d(np.asarray(salary, dtype=np.float64))
+    n = salary.size
+    bonus = _as_array(bonus_annual, n)
+    other = _as_array(other_deductions, n)
+    incide_medias = np.broadcast_to(np.asarray(incide_medias if incide_medias is not None else False, dtype=bool), (n,))
+    incide_bonus = np.broadcast_to(np.asarray(incide_bonus if incide_bonus is not None else False, dtype=bool), (n,))
+
+    rules = DATA.rules.get(country)
+    earn = _earnings(country, rules.provision, salary, bonus, incide_medias, bonus_month, vacation_month)
+    gross = earn["salary"] + earn["vacation_bonus"] + earn["bonus"] + earn["thirteenth"]
+
+    deductions = _deductions(rules, DATA.registry.base(country), earn, gross,
+                             _as_array(dependents, n), _as_array(state_rate, n))
+    deductions["other_deductions"] = np.repeat(rules.other_deductions(other)[:, None], MONTHS, axis=1)
+
+    total_deductions = sum(deductions.values(), np.zeros((n, MONTHS)))
+    charges = _employer_charges(country, earn, incide_bonus)
+    total_charges = sum(charges.values(), np.zeros((n, MONTHS)))
+    net = gross - total_deductions
+
+    return {"earnings": earn, "deductions": deductions, "gross": gross,
+            "total_deductions": total_deductions, "net": net,
+            "charges": charges, "total_charges": total_charges,
+            "employer_cost": gross + total_charges,
+            "ytd_gross": np.cumsum(gross, axis=1), "ytd_net": np.cumsum(net, axis=1)}
+
+
+# Totais anuais por empregado no resultado colunar
+ANNUAL_COLUMNS = ("gross_annual", "deductions_annual", "net_annual", "charges_annual", "employer_cost_annual")
+
+
+def project_year_frame(df, monthly: bool = False):
+    """
+    Projeção anual para um DataFrame com as mesmas colunas de src/bulk.py
+    (mais bonus_month e vacation_month, opcionais).
+    `monthly=False` devolve o DataFrame com os totais de ANNUAL_COLUMNS;
+    `monthly=True` devolve formato longo (uma linha por empregado e mês).
+    """
+    import pandas as pd
+
+    n = len(df)
+    fields = ("gross", "total_deductions", "net", "total_charges", "employer_cost")
+    out = {key: np.zeros((n, MONTHS)) for key in fields}
+
+    salary = _column(df, "salary_monthly", n)
+    dependents = _column(df, "dependents", n)
+    other = _column(df, "other_deductions", n)
+    bonus = _column(df, "bonus_annual", n)
+    incide_medias = _column(df, "incide_medias", n, bool, False)
+    incide_bonus = _column(df, "incide_bonus", n, bool, False)
+    bonus_month = _column(df, "bonus_month", n, np.int64, DEFAULT_BONUS_MONTH)
+    vacation_month = _column(df, "vacation_month", n, np.int64, DEFAULT_VACATION_MONTH)
+    state_rate = (df["state"].map(DATA.us_rates).fillna(0.0).to_numpy(dtype=np.float64)
+                  if "state" in df else np.zeros(n))
+
+    for country, idx in df.groupby("country", sort=False).indices.items():
+        res = project_year(country, salary[idx], dependents[idx], other[idx], bonus[idx],
+                           incide_medias[idx], incide_bonus[idx], state_rate[idx],
+                           bonus_month[idx], vacation_month[idx])
+        for key in fields:
+            out[key][idx] = res[key]
+
+    if monthly:
+        long = {"row": np.repeat(df.index.to_numpy(), MONTHS), "month": np.tile(MONTH_INDEX, n)}
+        long.update({key: values.ravel() for key, values in out.items()})
+        return pd.DataFrame(long)
+
+    annual = pd.DataFrame({name: out[key].sum(axis=1) for name, key in zip(ANNUAL_COLUMNS, fields)},
+                          index=df.index)
+    return pd.concat([df, annual], axis=1)
@@ -0,0 +1,149 @@
+"""
+Registro de versões das tabelas com data de vigência.
+
+Cada país tem uma lista de `TableSet` ordenada por `valid_from`: a versão
+dos arquivos atuais (br_inss.json, br_irrf.json, country_tables.json, com a
+vigência de countries.json) mais as versões de data/table_history.json,
+históricas ou futuras. "Qual tabela vale na data D" é uma bisseção sobre as
+datas de início; em lote, um `searchsorted` devolve o índice da versão de
+cada linha e os motores calculam cada grupo de versão numa única passada.
+
+Formato de table_history.json (campos ausentes herdam a versão atual):
+    {"Brasil": [{"valid_from": "2024-01-01", "br_inss": {...}, "br_irrf": {...}}],
+     "México": [{"valid_from": "2026-01-01", "rates": {...}, "employer_cost": [...],
+                 "remun_months": 12.5, "annual_caps": {"IMSS": 1032402.5}}]}
+"""
+import dataclasses
+import datetime
+from bisect import bisect_right
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.tables import (TableError, TableSet, compile_charges, compile_flat_rates,
+                        compile_inss, compile_irrf)
+
+OLDEST_DATE = "1900-01-01"   # vigência das versões atuais sem data informada
+
+# (país, tetos anuais da versão) -> {trecho do nome do tributo: teto mensal da base}
+FlatRateCaps = Callable[[str, Dict[str, Optional[float]]], Dict[str, float]]
+
+
+def iso_date(value) -> str:
+    """Normaliza date/datetime/str (AAAA-MM-DD...) para 'AAAA-MM-DD'."""
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    try:
+        return datetime.date.fromisoformat(str(value)[:10]).isoformat()
+    except ValueError as e:
+        raise TableError(f"Data inválida: {value!r}") from e
+
+
+def date_array(values):
+    """Datas como array datetime64[D]; células vazias ou inválidas viram NaT."""
+    import sys
+
+    import numpy as np
+
+    pd = sys.modules.get("pandas")   # colunas de CSV/Parquet chegam como Series
+    if pd is not None and isinstance(values, (pd.Series, pd.Index)):
+        return pd.to_datetime(values, errors="coerce").to_numpy().astype("datetime64[D]")
+    values = np.asarray(values)
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[D]")
+    out = np.full(values.size, np.datetime64("NaT"), dtype="datetime64[D]")
+    for i, value in enumerate(values.ravel().tolist()):
+        if value is not None and value == value and value != "":
+            try:
+                out[i] = iso_date(value)
+            except TableError:
+                pass
+    return out
+
+
+class TableRegistry:
+    """Versões das tabelas por país, consultadas por data de referência."""
+
+    def __init__(self, versions: Dict[str, Sequence[TableSet]], base: Dict[str, TableSet]):
+        self._versions = {c: tuple(sorted(v, key=lambda t: t.valid_from)) for c, v in versions.items()}
+        self._dates = {c: [t.valid_from for t in v] for c, v in self._versions.items()}
+        self._base = base
+
+    def countries(self) -> Tuple[str, ...]:
+        return tuple(self._versions)
+
+    def versions(self, country: str) -> Tuple[TableSet, ...]:
+        return self._versions.get(country, ())
+
+    def base(self, country: str) -> Optional[TableSet]:
+        """Versão dos arquivos atuais (usada quando nenhuma data é informada)."""
+        return self._base.get(country)
+
+    def index(self, country: str, date) -> int:
+        """Índice da versão vigente em `date`; datas anteriores à primeira usam a mais antiga."""
+        return max(bisect_right(self._dates.get(country, []), iso_date(date)) - 1, 0)
+
+    def as_of(self, country: str, date=None) -> Optional[TableSet]:
+        if date is None:
+            return self.base(country)
+        versions = self._versions.get(country)
+        return versions[self.index(country, date)] if versions else None
+
+    def index_batch(self, country: str, dates):
+        """
+        Índices de versão para um array de datas (datetime64, strings ISO ou datas).
+        Datas vazias/inválidas (NaT) recebem -1: quem chama usa as tabelas atuais.
+        """
+        import numpy as np
+
+        starts = np.array(self._dates.get(country, [OLDEST_DATE]), dtype="datetime64[D]")
+        dates = date_array(dates)
+        index = np.maximum(np.searchsorted(starts, dates, side="right") - 1, 0)
+        return np.where(np.isnat(dates), -1, index)
+
+
+def _compile_version(base: TableSet, entry: Dict, flat_rate_caps: FlatRateCaps,
+                     base_12: bool, where: str) -> TableSet:
+    if not isinstance(entry, dict) or "valid_from" not in entry:
+        raise TableError(f"{where}: versão sem 'valid_from'")
+    country = base.country
+    charges = base.charges
+    if "employer_cost" in entry:
+        months = entry.get("remun_months", charges.months_factor if charges else 12.0)
+        charges = compile_charges(country, entry["employer_cost"], months, base_12, where)
+    elif "remun_months" in entry and charges is not None:
+        charges = dataclasses.replace(charges, months_factor=float(entry["remun_months"]))
+    caps = dict(base.annual_caps)
+    caps.update(entry.get("annual_caps", {}))
+    flat_rates = base.flat_rates
+    if "rates" in entry or ("annual_caps" in entry and flat_rates is not None):
+        # Tetos das alíquotas simplificadas refeitos com os tetos da versão
+        rates = entry["rates"] if "rates" in entry else dict(zip(flat_rates.names, flat_rates.rates))
+        flat_rates = compile_flat_rates(country, {"rates": rates}, flat_rate_caps(country, caps), where)
+    return TableSet(
+        country=country,
+        valid_from=iso_date(entry["valid_from"]),
+        inss=compile_inss(entry["br_inss"], where) if "br_inss" in entry else base.inss,
+        irrf=compile_irrf(entry["br_irrf"], where) if "br_irrf" in entry else base.irrf,
+        flat_rates=flat_rates,
+        charges=charges,
+        annual_caps=tuple(caps.items()),
+    )
+
+
+def build_registry(base: Dict[str, TableSet], history: Dict, flat_rate_caps: FlatRateCaps,
+                   base_12_countries: Sequence[str], where: str = "table_history.json") -> TableRegistry:
+    """Monta o registro a partir das versões atuais e do histórico bruto (valida na carga)."""
+    if not isinstance(history, dict):
+        raise TableError(f"{where}: esperado um objeto {{país: [versões]}}")
+    versions: Dict[str, List[TableSet]] = {country: [tables] for country, tables in base.items()}
+    for country, entries in history.items():
+        if country not in base:
+            raise TableError(f"{where}: país desconhecido '{country}'")
+        for entry in entries:
+            version = _compile_version(base[country], entry, flat_rate_caps,
+                                       country in base_12_countries, f"{where} [{country}]")
+            if any(v.valid_from == version.valid_from for v in versions[country]):
+                raise TableError(f"{where} [{country}]: vigência {version.valid_from} repetida")
+            versions[country].append(version)
+    return TableRegistry(versions, base)
@@ -0,0 +1,233 @@
+"""
+Resultados compactos dos motores de cálculo.
+
+Em vez de uma lista de tuplas (descrição, provento, desconto) e de dicts
+{"Item", "Valor", "Rate"} por empregado, cada item é um código inteiro de um
+esquema fixo (INSS, IRRF, FICA, um código por tributo/encargo das tabelas),
+internado uma única vez no processo, e os valores ficam em colunas float64.
+O mesmo esquema de códigos é compartilhado por todos os resultados iguais.
+
+Os rótulos só são montados na exibição, traduzidos pelo i18n.json
+(chaves "line_*"); nomes vindos das tabelas (ex.: "IMSS", "RAT") são
+exibidos como estão. `lines`/`breakdown` continuam disponíveis como
+propriedades, montadas sob demanda no formato antigo.
+
+Para lotes, `LineTable` guarda uma matriz (códigos × empregados) contígua
+por código: cada coluna vira uma Series do pandas ou um array do Arrow sem cópia.
+"""
+import threading
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# --- CÓDIGOS DE ITENS ---
+# código -> (chave no i18n.json, rótulo padrão); `{state}`/`{rate}` vêm do contexto do resultado
+LINE_LABELS: Dict[str, Tuple[str, str]] = {
+    "base_salary": ("line_base_salary", "Salário Base"),
+    "medias_provision": ("line_medias_provision", "Provisão Médias s/ Bônus"),
+    "inss": ("line_inss", "INSS"),
+    "irrf": ("line_irrf", "IRRF"),
+    "us_social_security": ("line_us_social_security", "Social Security (6.2%)"),
+    "us_medicare": ("line_us_medicare", "Medicare (1.45%)"),
+    "us_state_tax": ("line_us_state_tax", "State Tax - {state} ({rate:.2f}%)"),
+    "state_tax": ("line_state_tax", "State Tax"),   # coluna de lote (estado varia por linha)
+    "other_deductions": ("line_other_deductions", "Outras Deduções"),
+    "fgts": ("line_fgts", "FGTS"),
+}
+TAX_PREFIX = "tax:"         # tributos das tabelas simplificadas (country_tables.json)
+CHARGE_PREFIX = "charge:"   # encargos do empregador
+
+_CODES: List[str] = []
+_INDEX: Dict[str, int] = {}
+_SCHEMAS: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+_REGISTER_LOCK = threading.Lock()
+
+
+def line_code(name: str) -> int:
+    """Código inteiro de um item (registrado na primeira vez que aparece)."""
+    code = _INDEX.get(name)
+    if code is None:
+        # Registro sob lock: duas threads com nomes novos não podem receber o mesmo código
+        with _REGISTER_LOCK:
+            code = _INDEX.get(name)
+            if code is None:
+                code = len(_CODES)
+                _CODES.append(name)
+                _INDEX[name] = code
+    return code
+
+
+def code_name(code: int) -> str:
+    return _CODES[code]
+
+
+def schema(names: Iterable[str]) -> Tuple[int, ...]:
+    """Tupla de códigos compartilhada entre todos os resultados com os mesmos itens."""
+    codes = tuple(line_code(n) for n in names)
+    return _SCHEMAS.setdefault(codes, codes)
+
+
+for _name in LINE_LABELS:
+    line_code(_name)
+
+
+def line_label(code: int, T: Optional[dict] = None, context: Optional[Dict[str, Any]] = None) -> str:
+    """Rótulo de exibição de um item no idioma `T` (dicionário do i18n.json)."""
+    name = _CODES[code]
+    for prefix in (TAX_PREFIX, CHARGE_PREFIX):
+        if name.startswith(prefix):
+            return name[len(prefix):]
+    key, default = LINE_LABELS.get(name, (None, name))
+    template = (T or {}).get(key, default) if key else default
+    return template.format(**context) if context and "{" in template else template
+
+
+# --- RESULTADOS ESCALARES ---
+class NetResult(Mapping):
+    """
+    Líquido de um empregado: totais + itens (códigos e colunas provento/desconto).
+    Acesso por chave como o dict antigo (res["net_salary"], res["lines"]).
+    """
+    __slots__ = ("total_earnings", "total_deductions", "net_salary", "fgts", "codes", "earn", "ded", "context")
+    _KEYS = ("total_earnings", "total_deductions", "net_salary", "fgts", "lines")
+
+    def __init__(self, codes: Tuple[int, ...], earn: Sequence[float], ded: Sequence[float],
+                 total_earnings: float, total_deductions: float, fgts: float = 0.0,
+                 context: Optional[Dict[str, Any]] = None):
+        self.codes = codes
+        self.earn = array("d", earn)
+        self.ded = array("d", ded)
+        self.total_earnings = total_earnings
+        self.total_deductions = total_deductions
+        self.net_salary = total_earnings - total_deductions
+        self.fgts = fgts
+        self.context = context
+
+    def lines_for(self, T: Optional[dict] = None) -> List[Tuple[str, float, float]]:
+        """(descrição, provento, desconto) com os rótulos no idioma `T`."""
+        return [(line_label(c, T, self.context), e, d) for c, e, d in zip(self.codes, self.earn, self.ded)]
+
+    @property
+    def lines(self) -> List[Tuple[str, float, float]]:
+        return self.lines_for()
+
+    def __getitem__(self, key: str):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def to_dict(self, T: Optional[dict] = None) -> Dict[str, Any]:
+        return {"lines": self.lines_for(T), "total_earnings": self.total_earnings,
+                "total_deductions": self.total_deductions, "net_salary": self.net_salary, "fgts": self.fgts}
+
+
+class CostResult(Mapping):
+    """Custo empregador de um empregado: totais + encargos (códigos, valores e alíquotas exibidas)."""
+    __slots__ = ("total_cost", "total_charges", "multiplier", "months_factor", "codes", "values", "rates")
+    _KEYS = ("total_cost", "total_charges", "multiplier", "months_factor", "breakdown")
+
+    def __init__(self, codes: Tuple[int, ...], values: Sequence[float], rates: Sequence[float],
+                 total_cost: float, total_charges: float, multiplier: float, months_factor: float):
+        self.codes = codes
+        self.values = array("d", values)
+        self.rates = rates   # tupla da própria tabela compilada (compartilhada)
+        self.total_cost = total_cost
+        self.total_charges = total_charges
+        self.multiplier = multiplier
+        self.months_factor = months_factor
+
+    def charges(self, T: Optional[dict] = None) -> List[Tuple[str, float]]:
+        """(encargo, valor anual) na ordem da tabela."""
+        return [(line_label(c, T), v) for c, v in zip(self.codes, self.values)]
+
+    @property
+    def breakdown(self) -> List[Dict[str, Any]]:
+        return [{"Item": line_label(c), "Valor": v, "Rate": r} for c, v, r in zip(self.codes, self.values, self.rates)]
+
+    def __getitem__(self, key: str):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in self._KEYS}
+
+
+# --- LOTES ---
+# Chave do resultado de src/batch.py -> código do item (as regras de src/rules.py registram as suas)
+_BATCH_LINES = {"medias_prov": "medias_provision", "inss": "inss", "irrf": "irrf",
+                "social_security": "us_social_security", "medicare": "us_medicare", "state_tax": "state_tax"}
+_BATCH_TOTALS = {"total_earnings", "total_deductions", "net_salary", "fgts"}
+
+
+def register_batch_line(key: str, code: str) -> None:
+    """Associa a chave de um componente no resultado em lote ao código do item (a primeira vale)."""
+    _BATCH_LINES.setdefault(key, code)
+    line_code(code)
+
+
+class LineTable:
+    """Itens de um lote: `values[k]` é a coluna (float64 contígua) do código `codes[k]`."""
+    __slots__ = ("codes", "values", "context")
+
+    def __init__(self, codes: Tuple[int, ...], values: np.ndarray, context: Optional[Dict[str, Any]] = None):
+        self.codes = codes
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.context = context
+
+    def __len__(self) -> int:
+        return self.values.shape[1]
+
+    def names(self) -> List[str]:
+        return [code_name(c) for c in self.codes]
+
+    def labels(self, T: Optional[dict] = None) -> List[str]:
+        return [line_label(c, T, self.context) for c in self.codes]
+
+    def columns(self, T: Optional[dict] = None, labels: bool = False) -> Dict[str, np.ndarray]:
+        """Coluna por item (visões da matriz, sem cópia); chaves = códigos ou rótulos."""
+        keys = self.labels(T) if labels else self.names()
+        return dict(zip(keys, self.values))
+
+    def to_frame(self, T: Optional[dict] = None, labels: bool = True, index=None):
+        import pandas as pd
+
+        # O pandas guarda blocos 2D como (colunas × linhas): a transposta entra sem cópia
+        keys = self.labels(T) if labels else self.names()
+        return pd.DataFrame(self.values.T, columns=keys, index=index, copy=False)
+
+    def to_arrow(self, T: Optional[dict] = None, labels: bool = False):
+        import pyarrow as pa
+
+        keys = self.labels(T) if labels else self.names()
+        return pa.table([pa.array(column) for column in self.values], names=keys)
+
+    @classmethod
+    def from_net_batch(cls, result: Dict[str, np.ndarray]) -> "LineTable":
+        """Itens de `get_net_salary_batch` (só os presentes no país; tributos das tabelas viram `tax:`)."""
+        keys = [k for k in result if k not in _BATCH_TOTALS]
+        codes = schema(_BATCH_LINES.get(k, TAX_PREFIX + k) for k in keys)
+        n = len(result["net_salary"])
+        return cls(codes, np.stack([result[k] for k in keys]) if keys else np.empty((0, n)))
+
+    @classmethod
+    def from_cost_batch(cls, result: Dict[str, Any]) -> "LineTable":
+        """Encargos de `get_employer_cost_batch`."""
+        charges = result["charges"]
+        n = len(result["total_cost"])
+        values = np.stack(list(charges.values())) if charges else np.empty((0, n))
+        return cls(schema(CHARGE_PREFIX + name for name in charges), values)
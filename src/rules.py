@@ -0,0 +1,444 @@
+"""
+Regras do líquido por país, descritas em data/regras_paises.json.
+
+Cada país é uma lista de componentes (faixas progressivas, alíquotas com
+teto, alíquota estadual, provisão sobre o bônus, alíquotas simplificadas de
+country_tables.json) compilada uma única vez em objetos imutáveis. Cada
+componente se calcula para um empregado (floats) e para um lote (arrays),
+então os motores escalar e em lote seguem as mesmas regras e um país novo
+não precisa de código: basta uma entrada no JSON (ou nenhuma, para o
+cálculo padrão).
+
+Tipos de componente ("tipo"):
+    progressiva        faixas do TableSet (`tabela`: inss/irrf); `deduz` tira da base
+                       componentes anteriores e `dependentes` aplica a dedução por dependente
+    aliquota           salário × `aliquota`, com base limitada a `teto_anual` / `divisor`
+    aliquota_estadual  salário × alíquota do estado (EUA), exibida só quando > 0
+    provisao_bonus     provento: média mensal do bônus × `meses` (+ 1/3 de férias)
+    aliquotas_tabela   um desconto por alíquota de country_tables.json (TABLES)
+
+Faixas, tetos anuais e alíquotas vêm do `TableSet` da versão em uso
+(src/registry.py); aqui fica só a forma do cálculo.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.results import TAX_PREFIX, NetResult, register_batch_line, schema
+from src.tables import IrrfTable, ProgressiveTable, TableError, _number
+
+
+class NetInputs(NamedTuple):
+    """Entradas do líquido: floats (um empregado) ou arrays do mesmo tamanho (lote)."""
+    salary: Any
+    dependents: Any = 0
+    other_deductions: Any = 0.0
+    bonus_annual: Any = 0.0
+    incide_medias: Any = False
+    state_rate: Any = 0.0
+    state_name: str = ""
+
+
+def _as_array(values, size: int, default: float = 0.0) -> np.ndarray:
+    """Converte escalar/lista/None em array float64 do tamanho do lote."""
+    if values is None:
+        return np.full(size, default, dtype=np.float64)
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.ndim == 0:
+        return np.full(size, float(arr), dtype=np.float64)
+    return arr
+
+
+def evaluate_progressive(table: ProgressiveTable, base: np.ndarray) -> np.ndarray:
+    """Versão vetorizada de `ProgressiveTable.evaluate` (searchsorted + multiplicação-soma)."""
+    base = np.asarray(base, dtype=np.float64)
+    if not table.limits:
+        return np.zeros_like(base)
+    limits = np.asarray(table.limits)
+    base = np.maximum(base, 0.0)
+    if table.clamp_top:
+        base = np.minimum(base, limits[-1])
+    idx = np.minimum(np.searchsorted(limits, base, side="left"), limits.size - 1)
+    value = np.maximum(np.asarray(table.offsets)[idx] + np.asarray(table.rates)[idx] * base, 0.0)
+    return np.minimum(value, table.cap) if table.cap else value
+
+
+# --------------------------------------------------------------------
+# Componentes
+# --------------------------------------------------------------------
+class _Single:
+    """Componente de um item só: `value` (escalar) e `column` (lote) calculam o valor."""
+    __slots__ = ()
+    earning = False
+    always_shown = True            # item sempre listado (senão, `shown` decide)
+    inputs: Tuple[str, ...] = ()   # entradas além do salário que a página deve pedir
+
+    def items(self, x: NetInputs, values: Dict, tables) -> Tuple[Tuple[str, str, float], ...]:
+        return ((self.code, self.key, self.value(x, values, tables)),)
+
+    def columns(self, x: NetInputs, values: Dict, tables) -> List[Tuple[str, np.ndarray]]:
+        return [(self.key, self.column(x, values, tables))]
+
+    def keys(self, tables) -> Tuple[str, ...]:
+        return (self.key,)
+
+    def shown(self, x: NetInputs) -> bool:
+        return True
+
+    def context(self, x: NetInputs) -> Optional[Dict[str, Any]]:
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class Progressive(_Single):
+    code: str
+    key: str
+    table: str                  # atributo do TableSet: "inss" ou "irrf"
+    minus: Tuple[str, ...] = ()
+    dependents: bool = False
+
+    @property
+    def inputs(self):
+        return ("dependents",) if self.dependents else ()
+
+    def bracket(self, tables):
+        """(faixas, dedução por dependente) do TableSet; faixas None se a versão não tiver a tabela."""
+        table = getattr(tables, self.table, None) if tables is not None else None
+        if isinstance(table, IrrfTable):
+            return table.brackets, (table.dependent_deduction if self.dependents else 0.0)
+        return table, 0.0
+
+    def _base(self, x: NetInputs, values: Dict):
+        base = x.salary
+        for key in self.minus:
+            base = base - values[key]
+        return base
+
+    def value(self, x, values, tables) -> float:
+        table, per_dependent = self.bracket(tables)
+        if table is None:
+            return 0.0
+        base = self._base(x, values)
+        if per_dependent:
+            base = max(base - (per_dependent * x.dependents), 0.0)
+        return table.evaluate(base)
+
+    def column(self, x, values, tables) -> np.ndarray:
+        table, per_dependent = self.bracket(tables)
+        if table is None:
+            return np.zeros_like(x.salary)
+        base = self._base(x, values)
+        if per_dependent:
+            base = np.maximum(base - (per_dependent * x.dependents), 0.0)
+        return evaluate_progressive(table, base)
+
+
+@dataclass(frozen=True, slots=True)
+class FlatRate(_Single):
+    code: str
+    key: str
+    rate: float
+    annual_cap: Optional[str] = None   # nome do teto anual no TableSet (ex: FICA_SS)
+    divisor: float = 1.0               # teto anual -> teto da base mensal
+
+    def _cap(self, tables) -> Optional[float]:
+        cap = tables.cap(self.annual_cap) if self.annual_cap and tables is not None else None
+        return None if cap is None else cap / self.divisor
+
+    def value(self, x, values, tables) -> float:
+        cap = self._cap(tables)
+        return (x.salary if cap is None else min(x.salary, cap)) * self.rate
+
+    def column(self, x, values, tables) -> np.ndarray:
+        cap = self._cap(tables)
+        return (x.salary if cap is None else np.minimum(x.salary, cap)) * self.rate
+
+
+@dataclass(frozen=True, slots=True)
+class StateRate(_Single):
+    code: str
+    key: str
+    inputs = ("state",)
+    always_shown = False
+
+    def value(self, x, values, tables) -> float:
+        return x.salary * x.state_rate
+
+    def column(self, x, values, tables) -> np.ndarray:
+        return x.salary * x.state_rate
+
+    def shown(self, x) -> bool:
+        return x.state_rate > 0
+
+    def context(self, x):
+        return {"state": x.state_name, "rate": x.state_rate * 100}
+
+
+@dataclass(frozen=True, slots=True)
+class BonusProvision(_Single):
+    code: str
+    key: str
+    months: float = 2.0          # 13º + férias
+    vacation_third: bool = True  # + 1/3 de férias
+    earning = True
+    always_shown = False
+    inputs = ("incide_medias",)
+
+    def shown(self, x) -> bool:
+        return bool(x.incide_medias) and x.bonus_annual > 0
+
+    def value(self, x, values, tables) -> float:
+        if not self.shown(x):
+            return 0.0
+        avg = x.bonus_annual / 12.0
+        return (avg * self.months) + (avg / 3.0 if self.vacation_third else 0.0)
+
+    def column(self, x, values, tables) -> np.ndarray:
+        avg = x.bonus_annual / 12.0
+        return np.where(x.incide_medias & (x.bonus_annual > 0),
+                        (avg * self.months) + (avg / 3.0 if self.vacation_third else 0.0), 0.0)
+
+
+@dataclass(frozen=True, slots=True)
+class TableRates:
+    """Alíquotas simplificadas do país (FlatRates do TableSet), um item por tributo."""
+    earning = False
+    always_shown = True
+    inputs = ()
+
+    def items(self, x, values, tables):
+        table = tables.flat_rates if tables is not None else None
+        if table is None:
+            return ()
+        salary = x.salary
+        return [(TAX_PREFIX + name, name, (salary if cap is None else min(salary, cap)) * rate)
+                for name, rate, cap in zip(table.names, table.rates, table.caps)]
+
+    def columns(self, x, values, tables):
+        table = tables.flat_rates if tables is not None else None
+        if table is None:
+            return []
+        salary = x.salary
+        return [(name, (salary if cap is None else np.minimum(salary, cap)) * rate)
+                for name, rate, cap in zip(table.names, table.rates, table.caps)]
+
+    def keys(self, tables) -> Tuple[str, ...]:
+        table = tables.flat_rates if tables is not None else None
+        return table.names if table is not None else ()
+
+    def shown(self, x) -> bool:
+        return True
+
+    def context(self, x):
+        return None
+
+
+# --------------------------------------------------------------------
+# Regras de um país
+# --------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class CountryRules:
+    components: Tuple[Any, ...]
+    fgts_rate: float = 0.0
+    base_12: bool = False                              # encargos sobre 12x o salário (sem 13º/férias)
+    rate_caps: Tuple[Tuple[str, str, float], ...] = ()  # (trecho do nome, teto anual, divisor)
+    negative_deductions: bool = False                  # outras deduções negativas (reembolsos) somam ao líquido
+
+    @property
+    def inputs(self) -> Tuple[str, ...]:
+        """Entradas usadas pelas regras (dependents, state, incide_medias), na ordem dos componentes."""
+        return tuple(dict.fromkeys(i for c in self.components for i in c.inputs))
+
+    def other_deductions(self, value):
+        """Parte de `other_deductions` descontada: só valores positivos, salvo `deducoes_negativas`."""
+        if self.negative_deductions:
+            return value
+        return np.where(value > 0, value, 0.0) if isinstance(value, np.ndarray) else (value if value > 0 else 0.0)
+
+    @property
+    def provision(self) -> Optional[BonusProvision]:
+        """Provisão de 13º/férias sobre o bônus, se o país tiver (src/projection.py lança os eventos)."""
+        return next((c for c in self.components if isinstance(c, BonusProvision)), None)
+
+    @property
+    def progressive(self) -> bool:
+        """Há descontos por faixas (o líquido tem quebras nos limites; ver src/grossup.py)."""
+        return any(isinstance(c, Progressive) for c in self.components)
+
+    def flat_rate_caps(self, annual_caps: Dict[str, Optional[float]]) -> Dict[str, float]:
+        """Trecho do nome do tributo -> teto mensal da base (para `compile_flat_rates`)."""
+        return {part: annual_caps[cap] / divisor for part, cap, divisor in self.rate_caps
+                if annual_caps.get(cap) is not None}
+
+    def keys(self, tables) -> Tuple[str, ...]:
+        """Colunas de componentes devolvidas por `net_batch` com estas tabelas, na ordem do cálculo."""
+        return tuple(dict.fromkeys(key for c in self.components for key in c.keys(tables)))
+
+    def net(self, x: NetInputs, tables) -> NetResult:
+        """Líquido de um empregado."""
+        codes, earn, ded = ["base_salary"], [x.salary], [0.0]
+        values: Dict[str, float] = {}
+        total_earn, total_ded, context = x.salary, 0.0, None
+        for component in self.components:
+            earning = component.earning
+            shown = component.always_shown or component.shown(x)
+            for code, key, value in component.items(x, values, tables):
+                values[key] = value
+                if earning:
+                    total_earn += value
+                else:
+                    total_ded += value
+                if shown:
+                    codes.append(code)
+                    earn.append(value if earning else 0.0)
+                    ded.append(0.0 if earning else value)
+            if shown and not component.always_shown and context is None:
+                context = component.context(x)
+
+        if x.other_deductions > 0:
+            codes.append("other_deductions"); earn.append(0.0); ded.append(x.other_deductions)
+        total_ded += self.other_deductions(x.other_deductions)
+        fgts = x.salary * self.fgts_rate if self.fgts_rate else 0.0
+        return NetResult(schema(codes), earn, ded, total_earn, total_ded, fgts=fgts, context=context)
+
+    def net_batch(self, x: NetInputs, tables) -> Dict[str, np.ndarray]:
+        """Líquido em lote: um array por componente + totais (ver src/batch.py)."""
+        n = x.salary.size
+        result: Dict[str, np.ndarray] = {}
+        total_earn, total_ded = x.salary, np.zeros(n)
+        for component in self.components:
+            for key, value in component.columns(x, result, tables):
+                result[key] = value
+                if component.earning:
+                    total_earn = total_earn + value
+                else:
+                    total_ded = total_ded + value
+
+        total_ded = total_ded + self.other_deductions(x.other_deductions)
+        result.update({"total_earnings": total_earn, "total_deductions": total_ded,
+                       "net_salary": total_earn - total_ded,
+                       "fgts": x.salary * self.fgts_rate if self.fgts_rate else np.zeros(n)})
+        return result
+
+
+class RuleBook:
+    """Regras compiladas por país; países sem entrada usam as regras padrão."""
+
+    def __init__(self, countries: Dict[str, CountryRules], default: CountryRules):
+        self._countries = countries
+        self.default = default
+
+    def get(self, country: str) -> CountryRules:
+        return self._countries.get(country, self.default)
+
+    def base_12_countries(self, countries) -> Tuple[str, ...]:
+        return tuple(c for c in countries if self.get(c).base_12)
+
+
+# --------------------------------------------------------------------
+# Compilação (JSON bruto -> regras)
+# --------------------------------------------------------------------
+DEFAULT_RULES = CountryRules(components=(TableRates(),))
+EMPLOYER_BASES = {"meses_remuneracao": False, "12_salarios": True}
+
+
+def _text(spec: Dict, field: str, where: str) -> str:
+    value = spec.get(field)
+    if not isinstance(value, str) or not value:
+        raise TableError(f"{where}: campo '{field}' obrigatório")
+    return value
+
+
+def _keyed(spec: Dict, where: str) -> Dict[str, str]:
+    code = _text(spec, "codigo", where)
+    key = spec.get("chave", code)
+    register_batch_line(key, code)
+    return {"code": code, "key": key}
+
+
+def _progressive(spec, where, known):
+    table = spec.get("tabela")
+    if table not in ("inss", "irrf"):
+        raise TableError(f"{where}: 'tabela' deve ser 'inss' ou 'irrf'")
+    minus = tuple(spec.get("deduz", ()))
+    unknown = [key for key in minus if key not in known]
+    if unknown:
+        raise TableError(f"{where}: 'deduz' cita componentes não calculados antes: {', '.join(unknown)}")
+    return Progressive(**_keyed(spec, where), table=table, minus=minus,
+                       dependents=bool(spec.get("dependentes", False)))
+
+
+def _flat_rate(spec, where, known):
+    divisor = _number(spec.get("divisor", 1.0), where)
+    if divisor <= 0:
+        raise TableError(f"{where}: 'divisor' deve ser positivo")
+    return FlatRate(**_keyed(spec, where), rate=_number(spec.get("aliquota"), where),
+                    annual_cap=spec.get("teto_anual"), divisor=divisor)
+
+
+def _state_rate(spec, where, known):
+    return StateRate(**_keyed(spec, where))
+
+
+def _bonus_provision(spec, where, known):
+    return BonusProvision(**_keyed(spec, where), months=_number(spec.get("meses", 2), where),
+                          vacation_third=bool(spec.get("terco_ferias", True)))
+
+
+def _table_rates(spec, where, known):
+    return TableRates()
+
+
+COMPONENTS = {"progressiva": _progressive, "aliquota": _flat_rate, "aliquota_estadual": _state_rate,
+              "provisao_bonus": _bonus_provision, "aliquotas_tabela": _table_rates}
+
+
+def _compile_country(country: str, spec: Dict, fallback: CountryRules, where: str) -> CountryRules:
+    loc = f"{where} [{country}]"
+    if not isinstance(spec, dict):
+        raise TableError(f"{loc}: regras devem ser um objeto")
+
+    components = fallback.components
+    if "liquido" in spec:
+        compiled, known = [], set()
+        for i, item in enumerate(spec["liquido"]):
+            item_loc = f"{loc} liquido[{i}]"
+            kind = item.get("tipo") if isinstance(item, dict) else None
+            if kind not in COMPONENTS:
+                raise TableError(f"{item_loc}: tipo desconhecido {kind!r} (use {', '.join(COMPONENTS)})")
+            component = COMPONENTS[kind](item, item_loc, known)
+            if isinstance(component, _Single):
+                known.add(component.key)
+            compiled.append(component)
+        components = tuple(compiled)
+
+    base = spec.get("base_encargos")
+    if base is not None and base not in EMPLOYER_BASES:
+        raise TableError(f"{loc}: 'base_encargos' deve ser um de {', '.join(EMPLOYER_BASES)}")
+
+    rate_caps = fallback.rate_caps
+    if "tetos_aliquotas" in spec:
+        try:
+            rate_caps = tuple((part, str(cap["teto_anual"]), _number(cap.get("divisor", 1.0), loc))
+                              for part, cap in spec["tetos_aliquotas"].items())
+        except (AttributeError, KeyError, TypeError) as e:
+            raise TableError(f"{loc}: 'tetos_aliquotas' malformado ({e})") from e
+
+    return CountryRules(components=components,
+                        fgts_rate=_number(spec["fgts"], loc) if "fgts" in spec else fallback.fgts_rate,
+                        base_12=EMPLOYER_BASES[base] if base is not None else fallback.base_12,
+                        rate_caps=rate_caps,
+                        negative_deductions=bool(spec.get("deducoes_negativas", fallback.negative_deductions)))
+
+
+def compile_rules(raw: Dict, where: str = "regras_paises.json") -> RuleBook:
+    """Compila o arquivo de regras; entradas de país herdam de 'padrao' o que não definirem."""
+    if not isinstance(raw, dict):
+        raise TableError(f"{where}: esperado um objeto")
+    default = _compile_country("padrao", raw.get("padrao", {}), DEFAULT_RULES, where)
+    countries = raw.get("paises", {})
+    if not isinstance(countries, dict):
+        raise TableError(f"{where}: 'paises' deve ser um objeto {{país: regras}}")
+    return RuleBook({country: _compile_country(country, spec, default, where)
+                     for country, spec in countries.items()}, default)
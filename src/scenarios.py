@@ -0,0 +1,130 @@
+"""
+Grade de cenários para planejamento: país × faixa salarial × nível de bônus × nível STI.
+
+O produto cartesiano é montado com NumPy e avaliado pelos motores vetorizados
+(src/bulk.simulate_chunk). Grades pequenas rodam no próprio processo; grades
+grandes são divididas em blocos e distribuídas num ProcessPoolExecutor.
+Cada worker carrega as tabelas compiladas uma única vez (no fork elas já vêm
+herdadas do processo pai) e os blocos são reunidos num único DataFrame.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import DATA
+
+# Abaixo deste número de linhas o custo de subir processos não compensa
+PARALLEL_MIN_ROWS = 200_000
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def sti_levels(areas: Optional[Iterable[str]] = None) -> List[Tuple[str, str, float]]:
+    """Lista (área, nível, target médio) a partir das faixas do sti_config.json."""
+    levels = []
+    for area, ranges in DATA.STI_RANGES.items():
+        if areas is not None and area not in areas:
+            continue
+        for level, (lo, hi) in ranges.items():
+            levels.append((area, level, (lo + hi) / 2.0))
+    return levels
+
+
+def build_grid(countries: Sequence[str], salaries: Sequence[float],
+               bonus_levels: Sequence[float] = (1.0,),
+               sti: Optional[Sequence[Tuple[str, str, float]]] = None,
+               incide_medias: bool = False, incide_bonus: bool = True):
+    """
+    Monta o produto cartesiano como DataFrame.
+    O bônus anual é salário × meses × target STI × nível de bônus (multiplicador
+    de desempenho); sem `sti`, o nível de bônus é aplicado como % direto do salário anual.
+    """
+    import pandas as pd
+
+    sti = list(sti) if sti else [("", "", 1.0)]
+    c_idx, s_idx, b_idx, t_idx = (a.ravel() for a in np.meshgrid(
+        np.arange(len(countries)), np.arange(len(salaries)),
+        np.arange(len(bonus_levels)), np.arange(len(sti)), indexing="ij"))
+
+    country = np.asarray(countries, dtype=object)[c_idx]
+    salary = np.asarray(salaries, dtype=np.float64)[s_idx]
+    bonus_level = np.asarray(bonus_levels, dtype=np.float64)[b_idx]
+    target = np.array([t[2] for t in sti], dtype=np.float64)[t_idx]
+    months = np.array([DATA.remun_months.get(c, 12.0) for c in countries])[c_idx]
+
+    return pd.DataFrame({
+        "country": country,
+        "salary_monthly": salary,
+        "bonus_level": bonus_level,
+        "sti_area": np.array([t[0] for t in sti], dtype=object)[t_idx],
+        "sti_level": np.array([t[1] for t in sti], dtype=object)[t_idx],
+        "sti_target": target,
+        "bonus_annual": salary * months * target * bonus_level,
+        "incide_medias": incide_medias,
+        "incide_bonus": incide_bonus,
+    })
+
+
+def _init_worker():
+    # Compila as tabelas uma vez por worker (já vêm prontas quando herdadas via fork)
+    DATA.preload()
+
+
+def _simulate(chunk):
+    from src.bulk import simulate_chunk
+    return simulate_chunk(chunk)
+
+
+def run_grid(grid, workers: Optional[int] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+             parallel_min_rows: int = PARALLEL_MIN_ROWS):
+    """
+    Avalia a grade e devolve um DataFrame na mesma ordem de linhas.
+    `workers=1` (ou grade menor que `parallel_min_rows`) roda no próprio processo.
+    """
+    import pandas as pd
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(grid) < parallel_min_rows:
+        return _simulate(grid)
+
+    chunks = [grid.iloc[i:i + chunk_rows] for i in range(0, len(grid), chunk_rows)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker) as pool:
+        results = list(pool.map(_simulate, chunks))
+    return pd.concat(results, ignore_index=False)
+
+
+def _simulate_spec(spec):
+    # O worker monta o próprio pedaço da grade: só os parâmetros trafegam na ida
+    countries, salaries, bonus_levels, sti, flags = spec
+    return _simulate(build_grid(countries, salaries, bonus_levels, sti, **flags))
+
+
+def run_scenarios(countries: Sequence[str], salaries: Sequence[float],
+                  bonus_levels: Sequence[float] = (0.0, 0.5, 1.0, 1.5),
+                  sti_areas: Optional[Iterable[str]] = None,
+                  incide_medias: bool = False, incide_bonus: bool = True,
+                  workers: Optional[int] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                  parallel_min_rows: int = PARALLEL_MIN_ROWS):
+    """
+    Grade completa com todos os níveis STI das áreas escolhidas.
+    Em paralelo, a grade é fatiada por país e por faixa de salários; a ordem
+    das linhas é a mesma de `build_grid` com os mesmos argumentos.
+    """
+    import pandas as pd
+
+    sti = sti_levels(sti_areas)
+    flags = {"incide_medias": incide_medias, "incide_bonus": incide_bonus}
+    per_salary = max(len(bonus_levels) * max(len(sti), 1), 1)
+    total = len(countries) * len(salaries) * per_salary
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or total < parallel_min_rows:
+        return _simulate(build_grid(countries, salaries, bonus_levels, sti, **flags))
+
+    step = max(chunk_rows // per_salary, 1)
+    specs = [([c], list(salaries[i:i + step]), list(bonus_levels), sti, flags)
+             for c in countries for i in range(0, len(salaries), step)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(specs)), initializer=_init_worker) as pool:
+        results = list(pool.map(_simulate_spec, specs))
+    return pd.concat(results, ignore_index=True)
@@ -0,0 +1,428 @@
+"""
+Serviço HTTP/JSON (sem interface) para os cálculos do simulador.
+
+Aplicação ASGI escrita só com a biblioteca padrão, na frente de
+`get_net_salary`, `get_employer_cost` e `get_sti_targets`, mais endpoints em
+lote que recebem milhares de empregados por requisição e usam os motores
+colunares de src/batch.py.
+
+O front-end é asyncio: requisições pequenas são calculadas no próprio laço
+(microssegundos, com o cache de resultados); lotes maiores vão para um pool
+de processos cujos workers carregam e compilam as tabelas uma única vez
+(`DATA.preload`). Cada endpoint
+registra a latência das últimas requisições e `/metrics` expõe p50/p99.
+
+Endpoints:
+    GET  /health          status e versão das tabelas
+    GET  /metrics         latência por endpoint (ms) e acertos dos caches
+    POST /net             {"country", "salary", "dependents", "other_deductions",
+                           "bonus_annual", "incide_medias", "state"}
+    POST /cost            {"country", "salary_monthly", "bonus_annual", "incide_bonus"}
+    GET  /sti-targets     ?area=...&level=...   (ou POST com o mesmo JSON)
+    POST /batch/net       {"employees": [{...}, ...]} ou {"columns": {"country": [...], ...}}
+    POST /batch/cost      idem; resposta colunar {"columns": {...}, "rows": n}
+
+Uso (a partir da raiz do projeto):
+    python -m src.service --port 8080 --workers 4
+Também pode ser servido por qualquer servidor ASGI: `src.service:app`.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+import numpy as np
+
+from src.batch import employer_cost_columns, net_salary_columns
+from src.calculations import cache_stats, get_employer_cost, get_net_salary, get_sti_targets
+from src.config import DATA
+from src.tables import TableError
+
+logger = logging.getLogger(__name__)
+
+INLINE_MAX_ROWS = 256            # lotes até este tamanho são calculados no laço
+MAX_BATCH_ROWS = 200_000
+MAX_BODY = 64 * 1024 * 1024      # bytes
+LATENCY_WINDOW = 10_000          # requisições guardadas por endpoint para os percentis
+
+
+# --------------------------------------------------------------------
+# Cálculos (executados no laço ou nos workers; precisam ser picklable)
+# --------------------------------------------------------------------
+def _init_worker():
+    """Inicializador do pool: compila/carrega as tabelas uma vez por processo."""
+    DATA.preload()
+
+
+def _columns(payload: Dict) -> Dict[str, list]:
+    """Aceita linhas ({"employees": [...]}) ou colunas ({"columns": {...}})."""
+    if "columns" in payload:
+        columns = payload["columns"]
+        if not isinstance(columns, dict):
+            raise ValueError("'columns' deve ser um objeto {coluna: [valores]}")
+    elif "employees" in payload:
+        rows = payload["employees"]
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise ValueError("'employees' deve ser uma lista de objetos")
+        names = {key for row in rows for key in row}
+        columns = {name: [row.get(name) for row in rows] for name in names}
+    else:
+        raise ValueError("Informe 'employees' ou 'columns'")
+    if "country" not in columns:
+        raise ValueError("Coluna obrigatória ausente: country")
+    n = len(columns["country"])
+    if any(len(values) != n for values in columns.values()):
+        raise ValueError("Todas as colunas devem ter o mesmo tamanho")
+    if n > MAX_BATCH_ROWS:
+        raise ValueError(f"Lote acima do limite de {MAX_BATCH_ROWS} empregados")
+    # Valores ausentes em colunas numéricas viram 0 (como nos motores em lote)
+    return {name: [0 if v is None and name not in ("country", "state", "reference_date") else v
+                   for v in values] for name, values in columns.items()}
+
+
+def _json_columns(result: Dict[str, np.ndarray]) -> Dict[str, list]:
+    return {name: values.tolist() for name, values in result.items()}
+
+
+def batch_net(columns: Dict[str, list]) -> Dict:
+    _check_countries(columns["country"])
+    return {"rows": len(columns["country"]), "columns": _json_columns(net_salary_columns(columns))}
+
+
+def batch_cost(columns: Dict[str, list]) -> Dict:
+    _check_countries(columns["country"])
+    return {"rows": len(columns["country"]), "columns": _json_columns(employer_cost_columns(columns))}
+
+
+def _check_countries(countries):
+    unknown = sorted({str(c) for c in countries} - set(DATA.countries))
+    if unknown:
+        raise ValueError(f"País desconhecido: {', '.join(unknown)}")
+
+
+def net_one(payload: Dict) -> Dict:
+    country = _country(payload)
+    state = payload.get("state", "")
+    return get_net_salary(country, _number(payload, "salary"),
+                          dependents=int(_number(payload, "dependents")),
+                          other_deductions=_number(payload, "other_deductions"),
+                          bonus_annual=_number(payload, "bonus_annual"),
+                          incide_medias=bool(payload.get("incide_medias", False)),
+                          state_rate=float(DATA.us_rates.get(state, 0.0)) if state else 0.0,
+                          state_name=state).to_dict()
+
+
+def cost_one(payload: Dict) -> Dict:
+    return get_employer_cost(_country(payload), _number(payload, "salary_monthly"),
+                             _number(payload, "bonus_annual"), bool(payload.get("incide_bonus", False))).to_dict()
+
+
+def sti_one(payload: Dict) -> Dict:
+    area, level = str(payload.get("area", "")), str(payload.get("level", ""))
+    low, high = get_sti_targets(area, level)
+    return {"area": area, "level": level, "min": low, "max": high}
+
+
+def _country(payload: Dict) -> str:
+    country = payload.get("country")
+    if country not in DATA.countries:
+        raise ValueError(f"País desconhecido: {country!r}")
+    return country
+
+
+def _number(payload: Dict, name: str) -> float:
+    value = payload.get(name) or 0
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"'{name}' deve ser numérico")
+    return float(value)
+
+
+# --------------------------------------------------------------------
+# Latência
+# --------------------------------------------------------------------
+class LatencyStats:
+    """Janela das últimas latências por endpoint (segundos) e contadores totais."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+        self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def summary(self) -> Dict[str, Dict]:
+        out = {}
+        for endpoint, samples in self._samples.items():
+            ms = np.fromiter(samples, dtype=np.float64, count=len(samples)) * 1000.0
+            p50, p99 = np.percentile(ms, (50, 99))
+            out[endpoint] = {"count": self._counts[endpoint], "window": int(ms.size),
+                             "mean_ms": float(ms.mean()), "p50_ms": float(p50),
+                             "p99_ms": float(p99), "max_ms": float(ms.max())}
+        return out
+
+
+# --------------------------------------------------------------------
+# Aplicação ASGI
+# --------------------------------------------------------------------
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Service:
+    """Aplicação ASGI (protocolos http e lifespan)."""
+
+    def __init__(self, workers: Optional[int] = None, inline_max_rows: int = INLINE_MAX_ROWS):
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.inline_max_rows = inline_max_rows
+        self.latency = LatencyStats()
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/metrics"): self.metrics,
+            ("POST", "/net"): self._inline(net_one),
+            ("POST", "/cost"): self._inline(cost_one),
+            ("GET", "/sti-targets"): self._inline(sti_one),
+            ("POST", "/sti-targets"): self._inline(sti_one),
+            ("POST", "/batch/net"): self._batched(batch_net),
+            ("POST", "/batch/cost"): self._batched(batch_cost),
+        }
+
+    # --- ciclo de vida ---
+    def startup(self):
+        DATA.preload()
+        if self.workers > 0 and self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker)
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    # --- handlers ---
+    async def health(self, payload: Dict) -> Dict:
+        return {"status": "ok", "table_version": DATA.table_version, "workers": self.workers}
+
+    async def metrics(self, payload: Dict) -> Dict:
+        return {"latency": self.latency.summary(), "cache": cache_stats()}
+
+    @staticmethod
+    def _inline(func):
+        async def handler(payload: Dict) -> Dict:
+            return func(payload)
+        return handler
+
+    def _batched(self, func):
+        async def handler(payload: Dict) -> Dict:
+            columns = _columns(payload)
+            if self.pool is None or len(columns["country"]) <= self.inline_max_rows:
+                return func(columns)
+            return await asyncio.get_running_loop().run_in_executor(self.pool, func, columns)
+        return handler
+
+    # --- protocolo ASGI ---
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    self.startup()
+                except (TableError, OSError) as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        start = time.perf_counter()
+        method, path = scope["method"], scope["path"].rstrip("/") or "/"
+        try:
+            handler = self.routes.get((method, path))
+            if handler is None:
+                if any(p == path for _, p in self.routes):
+                    raise HttpError(405, f"Método {method} não permitido em {path}")
+                raise HttpError(404, f"Endpoint inexistente: {path}")
+            payload = await self._payload(scope, receive)
+            status, body = 200, await handler(payload)
+        except HttpError as e:
+            status, body = e.status, {"error": str(e)}
+        except (ValueError, KeyError, TypeError) as e:
+            status, body = 400, {"error": str(e)}
+        except Exception:   # noqa: BLE001 - o serviço responde 500 e segue atendendo
+            logger.exception("Erro ao atender %s %s", method, path)
+            status, body = 500, {"error": "Erro interno"}
+
+        raw = json.dumps(body, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json; charset=utf-8"),
+                                (b"content-length", str(len(raw)).encode())]})
+        await send({"type": "http.response.body", "body": raw})
+        self.latency.record(f"{method} {path}", time.perf_counter() - start)
+
+    async def _payload(self, scope, receive) -> Dict:
+        body, more = bytearray(), True
+        while more:
+            message = await receive()
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+            if len(body) > MAX_BODY:
+                raise HttpError(413, "Requisição acima do tamanho máximo")
+        payload = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        if body:
+            try:
+                data = json.loads(body)
+            except ValueError as e:
+                raise HttpError(400, f"JSON inválido: {e}") from e
+            if not isinstance(data, dict):
+                raise HttpError(400, "O corpo deve ser um objeto JSON")
+            payload.update(data)
+        return payload
+
+
+def create_app(workers: Optional[int] = None, inline_max_rows: int = INLINE_MAX_ROWS) -> Service:
+    return Service(workers, inline_max_rows)
+
+
+app = create_app()
+
+
+# --------------------------------------------------------------------
+# Servidor HTTP/1.1 mínimo (asyncio) para rodar sem dependências externas
+# --------------------------------------------------------------------
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+async def _read_request(reader) -> Optional[Tuple[str, str, bytes, Dict[str, str], bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Linha de requisição inválida")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    if length > MAX_BODY:
+        raise HttpError(413, "Requisição acima do tamanho máximo")
+    body = await reader.readexactly(length) if length else b""
+    path, _, query = target.partition("?")
+    return method.upper(), path, query.encode("latin-1"), headers, body
+
+
+async def _handle_connection(application, reader, writer):
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except HttpError as e:
+                writer.write(f"HTTP/1.1 {e.status} {_REASONS.get(e.status, '')}\r\n"
+                             "content-length: 0\r\nconnection: close\r\n\r\n".encode("latin-1"))
+                break
+            if request is None:
+                break
+            method, path, query, headers, body = request
+            scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                     "method": method, "path": path, "query_string": query,
+                     "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()]}
+            sent = False
+
+            async def receive():
+                nonlocal sent
+                if sent:
+                    return {"type": "http.disconnect"}
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+                    head += [f"{k.decode('latin-1')}: {v.decode('latin-1')}" for k, v in message["headers"]]
+                    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+                elif message["type"] == "http.response.body":
+                    writer.write(message.get("body", b""))
+
+            await application(scope, receive, send)
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(application=app, host: str = "127.0.0.1", port: int = 8080):
+    """Atende `application` em host:port até ser cancelado (com os eventos de lifespan)."""
+    inbox, replies = asyncio.Queue(), asyncio.Queue()
+    lifespan = asyncio.create_task(application({"type": "lifespan", "asgi": {"version": "3.0"}},
+                                               inbox.get, replies.put))
+    await inbox.put({"type": "lifespan.startup"})
+    reply = await replies.get()
+    if reply["type"] != "lifespan.startup.complete":
+        raise RuntimeError(reply.get("message", "falha na inicialização"))
+
+    server = await asyncio.start_server(lambda r, w: _handle_connection(application, r, w), host, port)
+    logger.info("Serviço em http://%s:%s", host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await inbox.put({"type": "lifespan.shutdown"})
+        await lifespan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processos para os lotes (0 = tudo no laço; padrão = nº de CPUs)")
+    parser.add_argument("--inline-max-rows", type=int, default=INLINE_MAX_ROWS)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(_run(create_app(args.workers, args.inline_max_rows), args.host, args.port))
+
+
+async def _run(application, host: str, port: int):
+    # SIGINT/SIGTERM cancelam o servidor, o que dispara o shutdown do pool de workers
+    task = asyncio.current_task()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, task.cancel)
+        except (NotImplementedError, RuntimeError):   # Windows
+            pass
+    try:
+        await serve(application, host, port)
+    except asyncio.CancelledError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Varredura de sensibilidade: curvas de líquido, taxa efetiva e multiplicador
+do empregador sobre uma grade densa de salários.
+
+Cada país é avaliado de uma vez pelos motores vetorizados (src/batch.py)
+em milhares de pontos; antes de ir para o gráfico as curvas são reduzidas
+a algumas centenas de pontos (LTTB ou mínimo/máximo por balde), o que
+preserva o formato visual — inclusive os cantos das faixas e tetos — sem
+pesar no navegador.
+"""
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from src.batch import get_employer_cost_batch, get_net_salary_batch
+from src.cache import LRUCache, memoize
+from src.config import DATA
+from src.diskcache import shared_cache
+from src.instrument import timed
+
+DEFAULT_POINTS = 5_000
+DEFAULT_MAX_POINTS = 300
+
+# Métrica -> rótulo exibido no gráfico
+METRICS = {
+    "net_salary": "Líquido Mensal",
+    "effective_rate": "Taxa Efetiva",
+    "multiplier": "Multiplicador Custo",
+}
+
+
+# --- CURVAS ---
+def salary_sweep(country: str, salaries, bonus_ratio: float = 0.0,
+                 incide_bonus: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Líquido, taxa efetiva e multiplicador do empregador para cada salário.
+    O bônus anual é `bonus_ratio` × salário anual (12 meses).
+    """
+    salary = np.asarray(salaries, dtype=np.float64)
+    bonus = salary * 12.0 * bonus_ratio
+    net = get_net_salary_batch(country, salary, bonus_annual=bonus)
+    cost = get_employer_cost_batch(country, salary, bonus, incide_bonus)
+    earnings = net["total_earnings"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eff_rate = np.where(earnings > 0, net["total_deductions"] / earnings, 0.0)
+    return {"salary": salary, "net_salary": net["net_salary"],
+            "effective_rate": eff_rate, "multiplier": cost["multiplier"]}
+
+
+# --- REDUÇÃO DE PONTOS ---
+# As funções abaixo recebem `y` com uma série por linha (k × n, mesmo `x`),
+# então todas as curvas de uma varredura são reduzidas numa única passada.
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: índices (k × threshold) dos pontos que
+    preservam o formato de cada curva (x crescente). Mantém o primeiro e o último.
+    """
+    y = np.atleast_2d(y)
+    k, n = y.shape
+    if threshold >= n or threshold < 3:
+        return np.broadcast_to(np.arange(n), (k, n))
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # Média de cada balde (usada como terceiro vértice do triângulo)
+    counts = np.diff(edges)
+    avg_x = np.append(np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts, x[-1])
+    avg_y = np.column_stack((np.add.reduceat(y[:, 1:n - 1], edges[:-1] - 1, axis=1) / counts, y[:, -1]))
+
+    rows = np.arange(k)
+    selected = np.empty((k, threshold), dtype=np.int64)
+    selected[:, 0], selected[:, -1] = 0, n - 1
+    a = np.zeros(k, dtype=np.int64)
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a][:, None], y[rows, a][:, None]
+        cx, cy = avg_x[i + 1], avg_y[:, i + 1][:, None]
+        area = np.abs((ax - cx) * (y[:, lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        a = lo + np.argmax(area, axis=1)
+        selected[:, i + 1] = a
+    return selected
+
+
+def minmax_downsample(y: np.ndarray, buckets: int) -> np.ndarray:
+    """Índices (k × m) do mínimo e do máximo de cada balde (m <= 2 × `buckets` + 2), sem laços."""
+    y = np.atleast_2d(y)
+    k, n = y.shape
+    if 2 * buckets >= n or buckets < 1:
+        return np.broadcast_to(np.arange(n), (k, n))
+    size = -(-n // buckets)
+    buckets = -(-n // size)
+    padded = np.concatenate((y, np.full((k, size * buckets - n), np.nan)), axis=1)
+    blocks = padded.reshape(k, buckets, size)
+    offsets = np.arange(buckets) * size
+    edges = np.broadcast_to([0, n - 1], (k, 2))
+    idx = np.concatenate((edges, offsets + np.nanargmin(blocks, axis=2),
+                          offsets + np.nanargmax(blocks, axis=2)), axis=1)
+    # Ordena por x; índices repetidos (mín = máx no mesmo ponto) só repetem o ponto
+    return np.sort(idx, axis=1)
+
+
+def downsample(x: np.ndarray, y: np.ndarray, max_points: int, method: str = "lttb") -> np.ndarray:
+    """Índices a manter em cada série: `method` é 'lttb' ou 'minmax'."""
+    if method == "minmax":
+        return minmax_downsample(y, max(max_points // 2 - 1, 1))
+    if method == "lttb":
+        return lttb(x, y, max_points)
+    raise ValueError(f"Método de redução desconhecido: {method}")
+
+
+# --- FACHADA (gráfico) ---
+SWEEP_CACHE = LRUCache(64)
+# Curvas custam milissegundos: vale ler do cache em disco compartilhado, se configurado
+SWEEP_SHARED = shared_cache("sweep")
+
+
+def _sweep_key(countries, salary_min, salary_max, points=DEFAULT_POINTS,
+               max_points=DEFAULT_MAX_POINTS, bonus_ratio=0.0, method="lttb") -> Tuple:
+    return (tuple(countries), float(salary_min), float(salary_max), int(points),
+            int(max_points), float(bonus_ratio), method, DATA.table_version)
+
+
+@timed("sweep.sweep_frame")
+@memoize(SWEEP_CACHE, _sweep_key, SWEEP_SHARED)
+def sweep_frame(countries: Sequence[str], salary_min: float, salary_max: float,
+                points: int = DEFAULT_POINTS, max_points: int = DEFAULT_MAX_POINTS,
+                bonus_ratio: float = 0.0, method: str = "lttb"):
+    """
+    DataFrame longo (País, Salário, Métrica, Valor) pronto para o Altair:
+    `points` salários por país, cada série reduzida a até `max_points` pontos.
+    """
+    import pandas as pd
+
+    salaries = np.linspace(salary_min, salary_max, max(int(points), 2))
+    if not countries:
+        return pd.DataFrame(columns=["País", "Salário", "Métrica", "Valor"])
+
+    curves = [salary_sweep(country, salaries, bonus_ratio) for country in countries]
+    series = np.stack([c[key] for c in curves for key in METRICS])
+    keep = downsample(salaries, series, max_points, method)
+    m = keep.shape[1]
+
+    labels = list(METRICS.values())
+    return pd.DataFrame({
+        "País": np.repeat(np.asarray(countries, dtype=object), len(METRICS) * m),
+        "Salário": salaries[keep].ravel(),
+        "Métrica": np.tile(np.repeat(np.asarray(labels, dtype=object), m), len(countries)),
+        "Valor": np.take_along_axis(series, keep, axis=1).ravel(),
+    })
@@ -0,0 +1,197 @@
+"""
+Tabelas fiscais pré-compiladas.
+
+O `DataLoader` lê os JSON brutos uma única vez e os converte nas estruturas
+imutáveis abaixo. Os motores de cálculo só acessam tuplas e atributos,
+sem `.get()` aninhados a cada chamada, e dados malformados geram erro
+na carga do app em vez de no meio de uma simulação.
+"""
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+class TableError(ValueError):
+    """Tabela de dados malformada (detectada na carga)."""
+
+
+@dataclass(frozen=True, slots=True)
+class ProgressiveTable:
+    """
+    Tabela progressiva genérica em forma fechada.
+    Em cada faixa i o valor é `offsets[i] + rates[i] * base`; a faixa é achada
+    por bisseção nos limites, então cada cálculo custa uma busca e uma
+    multiplicação-soma, independente do número de faixas.
+    """
+    limits: Tuple[float, ...]
+    rates: Tuple[float, ...]
+    offsets: Tuple[float, ...]
+    cap: Optional[float] = None   # teto do valor calculado (ex: teto de contribuição)
+    clamp_top: bool = True        # base limitada ao último limite; False = última faixa aberta
+
+    def bracket(self, base: float) -> int:
+        return min(bisect_left(self.limits, base), len(self.limits) - 1)
+
+    def evaluate(self, base: float) -> float:
+        if not self.limits:
+            return 0.0
+        base = max(base, 0.0)
+        if self.clamp_top:
+            base = min(base, self.limits[-1])
+        i = self.bracket(base)
+        value = max(self.offsets[i] + self.rates[i] * base, 0.0)
+        return min(value, self.cap) if self.cap else value
+
+
+@dataclass(frozen=True, slots=True)
+class IrrfTable:
+    """Tabela de IR (faixas com parcela a deduzir) mais a dedução por dependente."""
+    brackets: ProgressiveTable
+    dependent_deduction: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class FlatRates:
+    """Alíquotas fixas sobre o salário (cálculo genérico), com teto opcional por item."""
+    names: Tuple[str, ...]
+    rates: Tuple[float, ...]
+    caps: Tuple[Optional[float], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class ChargeTable:
+    """Encargos do empregador de um país."""
+    names: Tuple[str, ...]
+    rates: Tuple[float, ...]          # já em fração (percentual / 100)
+    percents: Tuple[float, ...]       # valor original, exibido no breakdown
+    caps: Tuple[Optional[float], ...]
+    on_bonus: Tuple[bool, ...]
+    months_factor: float
+    base_12: bool                     # base = 12x salário (EUA/Canadá)
+    on_vacation: Tuple[bool, ...] = ()    # incide sobre o adicional de férias (projeção anual)
+    on_thirteenth: Tuple[bool, ...] = ()  # incide sobre 13º / aguinaldo (projeção anual)
+
+
+@dataclass(frozen=True, slots=True)
+class TableSet:
+    """Todas as tabelas de um país numa versão com data de início de vigência."""
+    country: str
+    valid_from: str                      # data ISO (AAAA-MM-DD)
+    inss: Optional[ProgressiveTable] = None
+    irrf: Optional[IrrfTable] = None
+    flat_rates: Optional[FlatRates] = None
+    charges: Optional[ChargeTable] = None
+    annual_caps: Tuple[Tuple[str, Optional[float]], ...] = ()
+
+    @property
+    def label(self) -> str:
+        return f"{self.country}@{self.valid_from}"
+
+    def cap(self, name: str, default: Optional[float] = None) -> Optional[float]:
+        return next((value for key, value in self.annual_caps if key == name), default)
+
+
+# --------------------------------------------------------------------
+# Compiladores (JSON bruto -> estruturas imutáveis)
+# --------------------------------------------------------------------
+def _number(value, where: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TableError(f"{where}: valor numérico esperado, recebido {value!r}")
+    return float(value)
+
+
+def _sorted_limits(limits: Tuple[float, ...], where: str) -> None:
+    if any(b <= a for a, b in zip(limits, limits[1:])):
+        raise TableError(f"{where}: limites das faixas devem ser crescentes")
+
+
+def compile_progressive(limits, rates, cap: Optional[float] = None,
+                        clamp_top: bool = True) -> ProgressiveTable:
+    """
+    Compila faixas marginais (alíquota sobre a parcela dentro de cada faixa).
+    O offset de cada faixa embute a contribuição acumulada até o seu piso.
+    Serve para INSS e para qualquer tabela progressiva futura (ex: ISR, federal EUA).
+    """
+    limits, rates = tuple(limits), tuple(rates)
+    offsets, acc, lower = [], 0.0, 0.0
+    for limit, rate in zip(limits, rates):
+        offsets.append(acc - lower * rate)
+        acc += (limit - lower) * rate
+        lower = limit
+    return ProgressiveTable(limits, rates, tuple(offsets), cap, clamp_top)
+
+
+def compile_deduction_brackets(limits, rates, deductions,
+                               clamp_top: bool = False) -> ProgressiveTable:
+    """Compila faixas no formato `base * alíquota - parcela a deduzir` (ex: IRRF)."""
+    return ProgressiveTable(tuple(limits), tuple(rates), tuple(-d for d in deductions),
+                            None, clamp_top)
+
+
+def _brackets(raw: Dict, fields, where: str):
+    faixas = raw.get("faixas", [])
+    try:
+        columns = tuple(tuple(_number(f[field], where) for f in faixas) for field in fields)
+    except (KeyError, TypeError) as e:
+        raise TableError(f"{where}: faixa sem campo {e}") from e
+    _sorted_limits(columns[0], where)
+    return columns
+
+
+def compile_inss(raw: Dict, where: str = "br_inss.json") -> ProgressiveTable:
+    limits, rates = _brackets(raw, ("ate", "aliquota"), where)
+    cap = raw.get("teto_contribuicao")
+    return compile_progressive(limits, rates, _number(cap, where) if cap else None)
+
+
+def compile_irrf(raw: Dict, where: str = "br_irrf.json") -> IrrfTable:
+    limits, rates, deductions = _brackets(raw, ("ate", "aliquota", "deducao"), where)
+    return IrrfTable(compile_deduction_brackets(limits, rates, deductions),
+                     _number(raw.get("deducao_dependente", 0.0), where))
+
+
+def compile_flat_rates(country: str, raw: Dict, caps: Dict[str, float],
+                       where: str = "country_tables.json") -> FlatRates:
+    """`caps` mapeia substring do nome do imposto -> teto mensal da base."""
+    rates = raw.get("rates", {})
+    if not isinstance(rates, dict):
+        raise TableError(f"{where}: 'rates' de {country} deve ser um objeto")
+    names = tuple(rates.keys())
+    values = tuple(_number(v, f"{where} [{country}]") for v in rates.values())
+    item_caps = tuple(next((cap for key, cap in caps.items() if key in name), None) for name in names)
+    return FlatRates(names, values, item_caps)
+
+
+def compile_charges(country: str, charges_list, months_factor,
+                    base_12: bool, where: str = "country_tables.json") -> ChargeTable:
+    loc = f"{where} [{country}]"
+    try:
+        names = tuple(str(c["nome"]) for c in charges_list)
+        percents = tuple(_number(c["percentual"], loc) for c in charges_list)
+    except (KeyError, TypeError) as e:
+        raise TableError(f"{loc}: encargo sem campo {e}") from e
+    caps = tuple(None if c.get("teto") is None else _number(c["teto"], loc) for c in charges_list)
+    return ChargeTable(names=names, rates=tuple(p / 100.0 for p in percents), percents=percents,
+                       caps=caps, on_bonus=tuple(bool(c.get("bonus")) for c in charges_list),
+                       months_factor=_number(months_factor, loc), base_12=base_12,
+                       on_vacation=tuple(bool(c.get("ferias")) for c in charges_list),
+                       on_thirteenth=tuple(bool(c.get("decimo")) for c in charges_list))
+
+
+def compile_sti_ranges(raw: Dict, where: str = "sti_config.json") -> Dict[str, Dict[str, Tuple[float, float]]]:
+    """Converte {área: {nível: [min, max]}} em tuplas validadas."""
+    compiled = {}
+    for area, levels in raw.items():
+        if not isinstance(levels, dict):
+            raise TableError(f"{where}: área '{area}' deve ser um objeto")
+        compiled[area] = {}
+        for level, bounds in levels.items():
+            if isinstance(bounds, dict):
+                bounds = (bounds.get("min"), bounds.get("max"))
+            if not isinstance(bounds, (list, tuple)) or len(bounds) != 2:
+                raise TableError(f"{where}: faixa de '{area}/{level}' deve ser [min, max]")
+            lo, hi = _number(bounds[0], where), _number(bounds[1], where)
+            if lo > hi:
+                raise TableError(f"{where}: '{area}/{level}' com mínimo maior que o máximo")
+            compiled[area][level] = (lo, hi)
+    return compiled
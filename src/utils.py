@@ -1,19 +1,84 @@
-from typing import Any, Optional
+import functools
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.instrument import timed
 
 # Formato padrão para caixas de número
 INPUT_FORMAT = "%.2f"
 
-def fmt_money(value: float, sym: str = "R$") -> str:
-    """Formata moeda no padrão brasileiro (ex: R$ 1.234,56)."""
-    if value is None: return f"{sym} 0,00"
+# --- FORMATO NUMÉRICO POR LOCALE ---
+# (separador decimal, separador de milhar); cada idioma do i18n.json informa o seu
+# em "number_format", e estes valores cobrem idiomas sem a chave.
+NUMBER_FORMATS: Dict[str, Tuple[str, str]] = {
+    "pt-BR": (",", "."),
+    "en-US": (".", ","),
+    "es": (",", "."),
+}
+DEFAULT_LOCALE = "pt-BR"
+
+
+def number_format(T: Optional[dict] = None) -> Tuple[str, str]:
+    """(decimal, milhar) do idioma ativo: `T` é o dicionário do i18n.json."""
+    T = T or {}
+    spec = T.get("number_format")
+    if isinstance(spec, dict):
+        return spec.get("decimal", ","), spec.get("thousands", ".")
+    return NUMBER_FORMATS.get(T.get("locale", DEFAULT_LOCALE), NUMBER_FORMATS[DEFAULT_LOCALE])
+
+
+@functools.lru_cache(maxsize=None)
+def _translation(fmt: Tuple[str, str]) -> Optional[dict]:
+    """Tabela de str.translate que leva o formato do Python (1,234.56) ao do locale; None = já está."""
+    decimal, thousands = fmt
+    if (decimal, thousands) == (".", ","):
+        return None
+    return str.maketrans({",": thousands, ".": decimal})
+
+
+@timed("fmt_money")
+def fmt_money(value: float, sym: str = "R$", fmt: Tuple[str, str] = NUMBER_FORMATS[DEFAULT_LOCALE]) -> str:
+    """Formata moeda no locale `fmt` (padrão brasileiro: R$ 1.234,56)."""
+    table = _translation(fmt)
     try:
-        formatted = f"{value:,.2f}"
-        return f"{sym} {formatted.replace(',', 'X').replace('.', ',').replace('X', '.')}"
-    except (ValueError, TypeError): return f"{sym} 0,00"
+        formatted = format(0.0 if value is None else value, ",.2f")
+    except (ValueError, TypeError):
+        formatted = "0.00"
+    return f"{sym} {formatted.translate(table) if table else formatted}"
+
+
+@timed("fmt_money_array")
+def fmt_money_array(values, sym: Union[str, Sequence[str]] = "R$",
+                    fmt: Tuple[str, str] = NUMBER_FORMATS[DEFAULT_LOCALE]) -> List[str]:
+    """
+    Versão em lote de `fmt_money` para colunas inteiras: `sym` escalar ou um por linha.
+    Formata tudo numa única string e troca os separadores numa passada só,
+    em vez de três `replace` por célula. NaN/None viram 0,00 como no escalar.
+    """
+    import numpy as np
+
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64).ravel(), nan=0.0, posinf=0.0, neginf=0.0)
+    if not values.size:
+        return []
+    body = "\n".join(map("{:,.2f}".format, values.tolist()))
+    table = _translation(fmt)
+    if table:
+        body = body.translate(table)
+    if isinstance(sym, str):
+        return (f"{sym} " + body.replace("\n", f"\n{sym} ")).split("\n")
+    return [f"{s} {v}" for s, v in zip(sym, body.split("\n"))]
+
+
+def format_money_columns(df, columns: Sequence[str], sym: Union[str, Sequence[str]] = "R$",
+                         fmt: Tuple[str, str] = NUMBER_FORMATS[DEFAULT_LOCALE]):
+    """Cópia de `df` com as colunas numéricas indicadas formatadas para exibição (o original continua numérico)."""
+    out = df.copy()
+    for col in columns:
+        out[col] = fmt_money_array(df[col].to_numpy(), sym, fmt)
+    return out
 
-def money_or_blank(v: float, sym: str) -> str:
+def money_or_blank(v: float, sym: str, fmt: Tuple[str, str] = NUMBER_FORMATS[DEFAULT_LOCALE]) -> str:
     """Retorna a moeda formatada ou string vazia se o valor for zero."""
-    return "" if abs(v) < 1e-9 else fmt_money(v, sym)
+    return "" if abs(v) < 1e-9 else fmt_money(v, sym, fmt)
 
 def fmt_percent(v: Optional[float]) -> str:
     """Formata decimal para porcentagem (0.2 -> 20.0%)."""
@@ -0,0 +1,167 @@
+"""
+Paridade dos motores de líquido e custo empregador.
+
+- escalar (src/calculations.py) × fórmulas originais de cada país, reescritas
+  aqui como estavam antes das regras compiladas (tolerância de meio centavo);
+- lote (src/batch.py) × escalar, linha a linha, inclusive com país
+  desconhecido e células vazias vindas de CSV.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.batch import get_employer_cost_frame, get_net_salary_frame
+from src.calculations import get_employer_cost, get_net_salary
+from src.config import ANNUAL_CAPS, DATA
+
+CENT = 0.005
+COUNTRIES = tuple(DATA.countries) + ("Atlântida",)   # o último não existe nas tabelas
+SALARIES = (0.0, 1000.0, 1412.0, 2666.69, 5000.0, 7786.02, 10000.0, 14000.37, 50000.0, 2_000_000.0)
+OTHER = (0.0, 150.0, -80.0)
+
+
+# --------------------------------------------------------------------
+# Fórmulas originais (antes de src/rules.py)
+# --------------------------------------------------------------------
+def _inss_br(salary, table):
+    contrib, prev_limit = 0.0, 0.0
+    for faixa in table["faixas"]:
+        if salary <= prev_limit:
+            break
+        contrib += (min(salary, faixa["ate"]) - prev_limit) * faixa["aliquota"]
+        prev_limit = faixa["ate"]
+    teto = table.get("teto_contribuicao")
+    return min(contrib, teto) if teto else contrib
+
+
+def _irrf_br(base_ir, dependents, table):
+    net_base = max(base_ir - table.get("deducao_dependente", 0.0) * dependents, 0.0)
+    for faixa in table["faixas"]:
+        if net_base <= faixa["ate"]:
+            return max(net_base * faixa["aliquota"] - faixa["deducao"], 0.0)
+    return 0.0
+
+
+def baseline_net(country, salary, dependents=0, other=0.0, bonus=0.0, incide_medias=False, state_rate=0.0):
+    if country == "Brasil":
+        inss = _inss_br(salary, DATA.br_inss)
+        irrf = _irrf_br(salary - inss, dependents, DATA.br_irrf)
+        medias = (bonus / 12.0) * 2 + (bonus / 12.0) / 3.0 if incide_medias and bonus > 0 else 0.0
+        return salary + medias - (inss + irrf + other)
+    if country == "Estados Unidos":
+        ss = min(salary, ANNUAL_CAPS["US_FICA"] / 12.0) * 0.062
+        return salary - (ss + salary * 0.0145 + salary * state_rate + other)
+    rates = DATA.country_tables["TABLES"].get(country, {}).get("rates", {})
+    total = 0.0
+    for name, rate in rates.items():
+        base = min(salary, ANNUAL_CAPS["MX_UMA_MONTHLY"]) if country == "México" and "IMSS" in name else salary
+        total += base * rate
+    return salary - (total + (other if other > 0 else 0.0))
+
+
+def baseline_cost(country, salary, bonus, incide_bonus):
+    months = DATA.country_tables["REMUN_MONTHS"].get(country, 12.0)
+    total_charges = 0.0
+    for charge in DATA.country_tables["EMPLOYER_COST"].get(country, []):
+        base = salary * 12.0 if country in ("Estados Unidos", "Canadá") else salary * months
+        if charge.get("bonus") and incide_bonus:
+            base += bonus
+        if charge.get("teto") is not None:
+            base = min(base, float(charge["teto"]))
+        total_charges += base * charge["percentual"] / 100.0
+    return salary * months + bonus + total_charges
+
+
+# --------------------------------------------------------------------
+# Escalar × fórmulas originais
+# --------------------------------------------------------------------
+@pytest.mark.parametrize("country", COUNTRIES)
+def test_net_matches_baseline(country):
+    state_rate = 0.05 if country == "Estados Unidos" else 0.0
+    for salary in SALARIES:
+        for dependents in (0, 2):
+            for other in OTHER:
+                for bonus, incide in ((0.0, False), (60000.0, True), (60000.0, False)):
+                    res = get_net_salary(country, salary, dependents=dependents, other_deductions=other,
+                                         bonus_annual=bonus, incide_medias=incide, state_rate=state_rate)
+                    expected = baseline_net(country, salary, dependents, other, bonus, incide, state_rate)
+                    assert res.net_salary == pytest.approx(expected, abs=CENT), (salary, dependents, other, bonus)
+
+
+@pytest.mark.parametrize("country", COUNTRIES)
+def test_employer_cost_matches_baseline(country):
+    for salary in SALARIES:
+        for bonus, incide in ((0.0, False), (60000.0, True), (60000.0, False)):
+            res = get_employer_cost(country, salary, bonus, incide)
+            assert res["total_cost"] == pytest.approx(baseline_cost(country, salary, bonus, incide), abs=CENT)
+
+
+# --------------------------------------------------------------------
+# Lote × escalar
+# --------------------------------------------------------------------
+def _frame():
+    rows = [(country, salary, dependents, other)
+            for country in COUNTRIES for salary in SALARIES for dependents in (0, 3) for other in OTHER]
+    df = pd.DataFrame(rows, columns=["country", "salary_monthly", "dependents", "other_deductions"])
+    df["bonus_annual"] = np.where(df.index % 2 == 0, 36000.0, 0.0)
+    df["incide_medias"] = df.index % 3 == 0
+    df["incide_bonus"] = df.index % 4 == 0
+    df["state"] = np.where(df["country"] == "Estados Unidos", "CA", "")
+    return df
+
+
+def _scalar_net(row):
+    return get_net_salary(row.country, row.salary_monthly, dependents=row.dependents,
+                          other_deductions=row.other_deductions, bonus_annual=row.bonus_annual,
+                          incide_medias=row.incide_medias, state_rate=DATA.us_rates.get(row.state, 0.0))
+
+
+def test_net_batch_matches_scalar():
+    df = _frame()
+    out = get_net_salary_frame(df)
+    for row in out.itertuples():
+        res = _scalar_net(row)
+        assert row.net_salary == pytest.approx(res.net_salary, abs=1e-9)
+        assert row.total_deductions == pytest.approx(res.total_deductions, abs=1e-9)
+        assert row.fgts == pytest.approx(res.fgts, abs=1e-9)
+
+
+def test_employer_cost_batch_matches_scalar():
+    df = _frame()
+    out = get_employer_cost_frame(df)
+    for row in out.itertuples():
+        res = get_employer_cost(row.country, row.salary_monthly, row.bonus_annual, row.incide_bonus)
+        assert row.total_cost == pytest.approx(res["total_cost"], abs=1e-9)
+        assert row.total_charges == pytest.approx(res["total_charges"], abs=1e-9)
+
+
+def test_unknown_country_keeps_salary():
+    out = get_net_salary_frame(pd.DataFrame({"country": ["Atlântida"], "salary_monthly": [5000.0],
+                                             "other_deductions": [100.0]}))
+    assert out["net_salary"].iloc[0] == pytest.approx(4900.0)
+    assert get_net_salary("Atlântida", 5000.0, other_deductions=100.0).net_salary == pytest.approx(4900.0)
+    cost = get_employer_cost_frame(pd.DataFrame({"country": ["Atlântida"], "salary_monthly": [5000.0]}))
+    assert cost["total_cost"].iloc[0] == pytest.approx(60000.0)
+
+
+def test_empty_cells_use_defaults():
+    csv = ("country,salary_monthly,dependents,other_deductions,bonus_annual,incide_medias,incide_bonus,state,reference_date\n"
+           "Brasil,10000,,,,,,,\n"
+           "Brasil,10000,0,0,0,False,False,,2025-03-01\n"
+           "Estados Unidos,9000,,,,não,0,,\n"
+           "Estados Unidos,9000,0,0,0,false,false,No State Tax,\n")
+    df = pd.read_csv(io.StringIO(csv))
+    net = get_net_salary_frame(df)
+    cost = get_employer_cost_frame(df)
+    assert net["net_salary"].iloc[0] == pytest.approx(net["net_salary"].iloc[1])
+    assert net["net_salary"].iloc[0] == pytest.approx(get_net_salary("Brasil", 10000.0).net_salary)
+    assert net["net_salary"].iloc[2] == pytest.approx(net["net_salary"].iloc[3])
+    assert cost["total_cost"].iloc[0] == pytest.approx(get_employer_cost("Brasil", 10000.0, 0.0, False)["total_cost"])
+
+
+def test_unknown_flag_spelling_is_rejected():
+    df = pd.DataFrame({"country": ["Brasil"], "salary_monthly": [10000.0], "incide_medias": ["talvez"]})
+    with pytest.raises(ValueError, match="incide_medias"):
+        get_net_salary_frame(df)
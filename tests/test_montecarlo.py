@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.montecarlo import simulate_sti_budget, sti_targets
+
+
+def _employees(**extra):
+    df = pd.DataFrame({"country": ["Brasil", "Brasil"], "salary_monthly": [10000.0, 20000.0],
+                       "sti_area": ["Non Sales", "Vendas Globais"], "sti_level": ["CEO", "Gerente"]})
+    return df.assign(**extra)
+
+
+def test_unknown_area_level_is_rejected():
+    with pytest.raises(ValueError, match="'Vendas Globais'/'Gerente'"):
+        simulate_sti_budget(_employees(), draws=10, seed=1)
+
+
+def test_sti_target_column_covers_unknown_area_level():
+    summary = simulate_sti_budget(_employees(sti_target=[np.nan, 0.2]), draws=10, seed=1)
+    assert (summary.loc[summary["metric"] == "bonus", "mean"] > 0).all()
+
+
+def test_known_area_level_uses_range_midpoint():
+    assert sti_targets(np.array(["Non Sales"], dtype=object), np.array(["CEO"], dtype=object))[0] > 0
@@ -1,10 +1,64 @@
 import streamlit as st
-import pandas as pd
+from src import instrument
 from src.config import DATA
 from src.calculations import get_net_salary, get_sti_targets
-from src.utils import fmt_money, money_or_blank, INPUT_FORMAT
+from src.grossup import solve_gross
+from src.incremental import Graph
+from src.utils import fmt_money, money_or_blank, number_format, INPUT_FORMAT
 from src.styles import card
 
+# --- GRAFO DE CÁLCULO (recalcula só os nós cujas entradas mudaram) ---
+NET_INPUTS = ("country", "dependents", "other_deductions", "state_rate", "state_name", "bonus", "incide_medias")
+
+def build_graph() -> Graph:
+    """Nós da página; um grafo por sessão, com resultados separados por país."""
+    graph = Graph()
+
+    @graph.node(inputs=NET_INPUTS + ("reverse", "salary_input"))
+    def gross(country, reverse, salary_input, dependents, other_deductions, state_rate, state_name,
+              bonus, incide_medias):
+        if not reverse:
+            return salary_input
+        return solve_gross(country, salary_input, dependents=dependents, other_deductions=other_deductions,
+                           state_rate=state_rate, bonus_annual=bonus, incide_medias=incide_medias)
+
+    @graph.node(inputs=NET_INPUTS, deps=("gross",))
+    def net(gross, country, dependents, other_deductions, state_rate, state_name, bonus, incide_medias):
+        return get_net_salary(country, gross, dependents=dependents, other_deductions=other_deductions,
+                              state_rate=state_rate, state_name=state_name,
+                              bonus_annual=bonus, incide_medias=incide_medias)
+
+    @graph.node(inputs=("country", "bonus"), deps=("gross",))
+    def annual(gross, country, bonus):
+        months = DATA.remun_months.get(country, 12.0)
+        return {"months": months, "salary": gross * months, "total": gross * months + bonus}
+
+    @graph.node(inputs=("area", "level", "bonus"), deps=("annual",))
+    def sti_html(annual, area, level, bonus):
+        sti_min, sti_max = get_sti_targets(area, level)
+        actual_sti = (bonus / annual["salary"]) if annual["salary"] > 0 else 0.0
+        in_target = (sti_min <= actual_sti <= sti_max) if level != "Others" else (actual_sti <= sti_max)
+        status_color = "green" if in_target else "red"
+        return f"**Target STI:** {sti_min*100:.0f}% - {sti_max*100:.0f}% | **Atual:** <span style='color:{status_color}'>{actual_sti*100:.1f}%</span>"
+
+    @graph.node(inputs=("sym", "nf", "lang"), deps=("net",))
+    def table_html(net, sym, nf, lang):
+        # Rótulos dos itens traduzidos só aqui, na montagem do HTML
+        T = DATA.i18n.get(lang, {})
+        labels = (T.get("rules_table_desc", "Descrição"), T.get("earnings", "Proventos"), T.get("deductions", "Descontos"))
+        with instrument.span("view.calculator.table_html"):
+            rows_html = ""
+            for desc, earn, ded in net.lines_for(T):
+                rows_html += f"<tr><td>{desc}</td><td style='color:green;text-align:right;'>{money_or_blank(earn, sym, nf)}</td><td style='color:red;text-align:right;'>{money_or_blank(ded, sym, nf)}</td></tr>"
+        return f"""
+    <table class="styled-table">
+        <thead><tr><th>{labels[0]}</th><th>{labels[1]}</th><th>{labels[2]}</th></tr></thead>
+        <tbody>{rows_html}</tbody>
+    </table>
+    """
+
+    return graph
+
 def render_page(T: dict):
     st.title(T.get("title_calc", "Simulador"))
 
@@ -20,6 +74,12 @@ def render_page(T: dict):
     country = col_c2.selectbox(T.get("country", "País"), country_list, index=idx, key="calc_country_sel")
     st.session_state.last_country = country
     sym = DATA.countries[country].get("symbol", "$")
+    nf = number_format(T)   # separadores do idioma ativo
+
+    # Modo: bruto -> líquido (padrão) ou líquido-alvo -> bruto necessário
+    modes = [T.get("mode_gross_to_net", "Bruto → Líquido"), T.get("mode_net_to_gross", "Líquido → Bruto")]
+    mode = st.radio(T.get("calc_mode", "Modo de cálculo"), modes, horizontal=True, key="calc_mode_sel")
+    reverse = mode == modes[1]
 
     # 2. PARÂMETROS EM ABAS
     tab_fixed, tab_variable = st.tabs([T.get("tab_fixed", "Fixo"), T.get("tab_variable", "Variável")])
@@ -27,17 +87,18 @@ def render_page(T: dict):
     
     with tab_fixed:
         c1, c2, c3 = st.columns(3)
-        salary = c1.number_input(f"{T.get('salary','Salário')} ({sym})", 0.0, value=10000.0, step=500.0, format=INPUT_FORMAT)
-        if country == "Brasil":
+        salary_label = T.get("target_net", "Líquido Desejado") if reverse else T.get("salary", "Salário")
+        salary = c1.number_input(f"{salary_label} ({sym})", 0.0, value=10000.0, step=500.0, format=INPUT_FORMAT)
+        # Campos extras conforme as regras do país (regras_paises.json)
+        rule_inputs = DATA.rules.get(country).inputs
+        if "dependents" in rule_inputs:
             dependents = c2.number_input(T.get("dependents", "Dependentes"), 0, value=0, step=1)
-            other_deductions = c3.number_input(f"{T.get('other_deductions','Outras Ded.')} ({sym})", 0.0, step=50.0, format=INPUT_FORMAT)
-        elif country == "Estados Unidos":
+        elif "state" in rule_inputs:
             state_name = c2.selectbox(T.get("state", "Estado"), options=list(DATA.us_rates.keys()))
             state_rate = DATA.us_rates.get(state_name, 0.0)
             c2.caption(f"Taxa: {state_rate*100:.2f}%")
-            other_deductions = c3.number_input(f"{T.get('other_deductions','Outras Ded.')} ({sym})", 0.0, step=50.0, format=INPUT_FORMAT)
-        else:
-             other_deductions = c2.number_input(f"{T.get('other_deductions','Outras Ded.')} ({sym})", 0.0, step=50.0, format=INPUT_FORMAT)
+        other_col = c3 if {"dependents", "state"} & set(rule_inputs) else c2
+        other_deductions = other_col.number_input(f"{T.get('other_deductions','Outras Ded.')} ({sym})", 0.0, step=50.0, format=INPUT_FORMAT)
 
     with tab_variable:
         c1, c2 = st.columns(2)
@@ -53,48 +114,43 @@ def render_page(T: dict):
 
         c_chk1, c_chk2 = st.columns(2)
         incide_medias = False
-        if country == "Brasil":
+        if "incide_medias" in rule_inputs:
             incide_medias = c_chk1.checkbox(T.get("lbl_incide_medias", "Incide Médias?"), value=False)
         
-        sti_min, sti_max = get_sti_targets(area, level)
-        months = DATA.country_tables["REMUN_MONTHS"].get(country, 12.0)
-        annual_sal = salary * months
-        actual_sti = (bonus / annual_sal) if annual_sal > 0 else 0.0
-        in_target = (sti_min <= actual_sti <= sti_max) if level != "Others" else (actual_sti <= sti_max)
-        status_color = "green" if in_target else "red"
-        st.markdown(f"**Target STI:** {sti_min*100:.0f}% - {sti_max*100:.0f}% | **Atual:** <span style='color:{status_color}'>{actual_sti*100:.1f}%</span>", unsafe_allow_html=True)
+        # Avaliação incremental: nós com as mesmas entradas (por país) não são refeitos
+        if "calc_graph" not in st.session_state:
+            st.session_state.calc_graph = build_graph()
+        values = st.session_state.calc_graph.evaluate(
+            ("gross", "net", "annual", "sti_html", "table_html"),
+            {"country": country, "reverse": reverse, "salary_input": salary, "dependents": dependents,
+             "other_deductions": other_deductions, "state_rate": state_rate, "state_name": state_name,
+             "bonus": bonus, "incide_medias": incide_medias, "area": area, "level": level,
+             "sym": sym, "nf": nf, "lang": st.session_state.get("locale", "Português")},
+            scope=country)
+        salary, res, annual = values["gross"], values["net"], values["annual"]
+        st.markdown(values["sti_html"], unsafe_allow_html=True)
 
     st.divider()
 
     # --- 3. RESULTADOS ---
-    res = get_net_salary(country, salary, dependents=dependents, other_deductions=other_deductions, 
-                         state_rate=state_rate, state_name=state_name, 
-                         bonus_annual=bonus, incide_medias=incide_medias)
+
+    if reverse:
+        st.metric(T.get("required_gross", "Salário Bruto Necessário"), fmt_money(salary, sym, nf))
 
     st.subheader(T.get("monthly_comp_title", "Mensal"))
     c1, c2, c3 = st.columns(3)
-    c1.markdown(card(T.get("tot_earnings", "Proventos"), fmt_money(res["total_earnings"], sym), "earn"), unsafe_allow_html=True)
-    c2.markdown(card(T.get("tot_deductions", "Descontos"), fmt_money(res["total_deductions"], sym), "ded"), unsafe_allow_html=True)
-    c3.markdown(card(T.get("net", "Líquido"), fmt_money(res["net_salary"], sym), "net"), unsafe_allow_html=True)
-    if country == "Brasil" and res["fgts"] > 0:
-        st.caption(f"💼 {T.get('fgts_deposit', 'FGTS')}: {fmt_money(res['fgts'], sym)}")
+    c1.markdown(card(T.get("tot_earnings", "Proventos"), fmt_money(res["total_earnings"], sym, nf), "earn"), unsafe_allow_html=True)
+    c2.markdown(card(T.get("tot_deductions", "Descontos"), fmt_money(res["total_deductions"], sym, nf), "ded"), unsafe_allow_html=True)
+    c3.markdown(card(T.get("net", "Líquido"), fmt_money(res["net_salary"], sym, nf), "net"), unsafe_allow_html=True)
+    if res["fgts"] > 0:
+        st.caption(f"💼 {T.get('fgts_deposit', 'FGTS')}: {fmt_money(res['fgts'], sym, nf)}")
 
     # Tabela de Detalhamento
-    rows_html = ""
-    for desc, earn, ded in res["lines"]:
-        rows_html += f"<tr><td>{desc}</td><td style='color:green;text-align:right;'>{money_or_blank(earn, sym)}</td><td style='color:red;text-align:right;'>{money_or_blank(ded, sym)}</td></tr>"
-    
-    st.markdown(f"""
-    <table class="styled-table">
-        <thead><tr><th>{T.get("rules_table_desc", "Descrição")}</th><th>{T.get("earnings", "Proventos")}</th><th>{T.get("deductions", "Descontos")}</th></tr></thead>
-        <tbody>{rows_html}</tbody>
-    </table>
-    """, unsafe_allow_html=True)
+    st.markdown(values["table_html"], unsafe_allow_html=True)
 
     st.divider()
     st.subheader(T.get("annual_comp_title", "Anual"))
-    annual_total = (salary * months) + bonus
     ac1, ac2, ac3 = st.columns(3)
-    ac1.metric(T.get("annual_salary", "Sal. Anual"), fmt_money(annual_sal, sym), help=f"{months} meses")
-    ac2.metric(T.get("annual_bonus", "Bônus"), fmt_money(bonus, sym))
-    ac3.metric(T.get("annual_total", "Total"), fmt_money(annual_total, sym))
+    ac1.metric(T.get("annual_salary", "Sal. Anual"), fmt_money(annual["salary"], sym, nf), help=f"{annual['months']} meses")
+    ac2.metric(T.get("annual_bonus", "Bônus"), fmt_money(bonus, sym, nf))
+    ac3.metric(T.get("annual_total", "Total"), fmt_money(annual["total"], sym, nf))
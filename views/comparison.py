@@ -1,13 +1,95 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import altair as alt
+from src import export
 from src.config import DATA
 from src.calculations import get_net_salary
-from src.utils import fmt_money, fmt_percent
+from src.fx import currency_symbol
+from src.sweep import METRICS, sweep_frame
+from src.utils import fmt_percent, format_money_columns, number_format
+
+# Colunas monetárias da tabela comparativa (formatadas só na exibição)
+MONEY_COLUMNS = ["Bruto Mensal", "Líquido Mensal", "Bruto Anual Est.", "Líquido Anual Est."]
+
+def build_comparison(selected_countries, base_salary: float, base_bonus: float,
+                     report_currency: str = None):
+    """
+    Tabela comparativa (DataFrame numérico, com o símbolo de cada linha em "Moeda")
+    e linhas do gráfico (sem Streamlit, reaproveitado nos benchmarks).
+    Com `report_currency`, salário e bônus informados estão nessa moeda: são convertidos
+    para a moeda de cada país, calculados localmente e os resultados voltam convertidos
+    (uma conversão vetorizada por coluna).
+    """
+    chart_data = []
+    n = len(selected_countries)
+    salary, bonus = np.full(n, base_salary), np.full(n, base_bonus)
+    if report_currency:
+        local = [DATA.currencies.get(c, report_currency) for c in selected_countries]
+        salary = DATA.fx.convert(salary, report_currency, local)
+        bonus = DATA.fx.convert(bonus, report_currency, local)
+
+    values = np.zeros((n, 4))   # bruto mensal, líquido, descontos, bruto anual
+    for i, c in enumerate(selected_countries):
+        res = get_net_salary(c, float(salary[i]), other_deductions=0, bonus_annual=float(bonus[i]))
+        months = DATA.remun_months.get(c, 12.0)
+        values[i] = (salary[i], res["net_salary"], res["total_deductions"], salary[i] * months + bonus[i])
+    earnings = values[:, 1] + values[:, 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eff_rate = np.where(earnings > 0, values[:, 2] / earnings, 0.0)
+    if report_currency:
+        values = DATA.fx.convert(values, np.asarray(local, dtype=object)[:, None], report_currency)
+
+    report_sym = currency_symbol(report_currency, DATA.countries, DATA.currencies) if report_currency else None
+    comp = pd.DataFrame({
+        "País": [f"{DATA.countries[c].get('flag','')} {c}" for c in selected_countries],
+        "Moeda": [report_sym or DATA.countries[c].get("symbol", "$") for c in selected_countries],
+        "Bruto Mensal": values[:, 0],
+        "Líquido Mensal": values[:, 1],
+        "Taxa Efetiva": eff_rate,
+        "Bruto Anual Est.": values[:, 3],
+        "Líquido Anual Est.": values[:, 3] * (1.0 - eff_rate),
+    })
+    for i, c in enumerate(selected_countries):
+        chart_data.extend([{"País":c, "Tipo":"Líquido", "Valor":values[i, 1]},
+                           {"País":c, "Tipo":"Impostos/Ded.", "Valor":values[i, 2]}])
+    return comp, chart_data
+
+def display_comparison(comp: pd.DataFrame, fmt) -> pd.DataFrame:
+    """Cópia formatada para exibição (moeda no locale `fmt`, taxa em %)."""
+    shown = format_money_columns(comp, MONEY_COLUMNS, comp["Moeda"].tolist(), fmt)
+    shown["Taxa Efetiva"] = [fmt_percent(v) for v in comp["Taxa Efetiva"]]
+    return shown.drop(columns="Moeda")
+
+def export_buttons(table_fn, basename: str, key: str):
+    """Downloads Parquet / Arrow IPC dos números da página (só com pyarrow instalado)."""
+    if not export.available():
+        return
+    table = table_fn()
+    b1, b2 = st.columns(2)
+    b1.download_button("⬇️ Parquet", export.table_bytes(table, "parquet"), f"{basename}.parquet",
+                       "application/vnd.apache.parquet", key=f"{key}_parquet")
+    b2.download_button("⬇️ Arrow IPC", export.table_bytes(table, "ipc"), f"{basename}.arrow",
+                       "application/vnd.apache.arrow.file", key=f"{key}_arrow")
+
+def comparison_table(comp: pd.DataFrame, selected_countries, report_currency: str = None):
+    """Tabela comparativa numérica em Arrow, com o código da moeda de cada linha."""
+    codes = [report_currency or DATA.currencies.get(c, "") for c in selected_countries]
+    return export.frame_table(comp.drop(columns="Moeda").assign(País=list(selected_countries)), codes)
+
+def report_currency_select(T: dict):
+    """Seletor de moeda de relatório; None = valores nominais na moeda de cada país."""
+    local = T.get("local_currency", "Moeda local (nominal)")
+    options = [local] + sorted(set(DATA.currencies.values()) & set(DATA.fx.currencies))
+    choice = st.selectbox(T.get("report_currency", "Moeda de relatório"), options)
+    if choice == local:
+        st.caption("Comparativo utilizando valores nominais (sem conversão cambial)")
+        return None
+    st.caption(f"Valores informados e resultados em {choice}, cotação de {DATA.fx.latest_date} (data/fx_rates.json)")
+    return choice
 
 def render_page(T: dict):
     st.title(T.get("menu_comp_paises", "Comparativo Países"))
-    st.caption("Comparativo utilizando valores nominais (sem conversão cambial)")
+    report_currency = report_currency_select(T)
 
     c1, c2 = st.columns(2)
     base_salary = c1.number_input("Salário Base Mensal (Nominal)", 10000.0, step=500.0, format="%.2f")
@@ -15,30 +97,15 @@ def render_page(T: dict):
     selected_countries = st.multiselect("Países", list(DATA.countries.keys()), default=["Brasil", "Estados Unidos"])
     if not selected_countries: return
 
-    comp_data, chart_data = [], []
-
-    for c in selected_countries:
-        sym = DATA.countries[c].get("symbol", "$")
-        res = get_net_salary(c, base_salary, other_deductions=0, bonus_annual=base_bonus)
-        months = DATA.country_tables["REMUN_MONTHS"].get(c, 12.0)
-        annual_gross = (base_salary * months) + base_bonus
-        eff_rate = (res["total_deductions"] / res["total_earnings"]) if res["total_earnings"] > 0 else 0.0
-        annual_net_est = annual_gross * (1.0 - eff_rate)
-
-        comp_data.append({
-            "País": f"{DATA.countries[c].get('flag','')} {c}",
-            "Bruto Mensal": fmt_money(base_salary, sym),
-            "Líquido Mensal": fmt_money(res["net_salary"], sym),
-            "Taxa Efetiva": fmt_percent(eff_rate),
-            "Bruto Anual Est.": fmt_money(annual_gross, sym),
-            "Líquido Anual Est.": fmt_money(annual_net_est, sym)
-        })
-        chart_data.extend([{"País":c, "Tipo":"Líquido", "Valor":res["net_salary"]}, 
-                           {"País":c, "Tipo":"Impostos/Ded.", "Valor":res["total_deductions"]}])
+    comp, chart_data = build_comparison(selected_countries, base_salary, base_bonus, report_currency)
     
-    tab1, tab2 = st.tabs(["📊 Visão Geral", "📈 Gráfico"])
-    with tab1: st.dataframe(pd.DataFrame(comp_data), use_container_width=True, hide_index=True)
+    tab1, tab2, tab3 = st.tabs(["📊 Visão Geral", "📈 Gráfico", "📉 Curvas Salariais"])
+    with tab1:
+        st.dataframe(display_comparison(comp, number_format(T)), use_container_width=True, hide_index=True)
+        export_buttons(lambda: comparison_table(comp, selected_countries, report_currency),
+                       "comparativo_paises", "comp_export")
     with tab2:
+        import altair as alt  # só carregado quando o gráfico é exibido
         chart = alt.Chart(pd.DataFrame(chart_data)).mark_bar().encode(
             x=alt.X('Valor', stack='normalize', axis=alt.Axis(format='%'), title="Distribuição %"),
             y=alt.Y('País'),
@@ -46,3 +113,23 @@ def render_page(T: dict):
             tooltip=['País', 'Tipo', alt.Tooltip('Valor', format=',.2f')]
         ).properties(height=100 + len(selected_countries)*30)
         st.altair_chart(chart, use_container_width=True)
+    with tab3:
+        import altair as alt
+        r1, r2, r3 = st.columns(3)
+        sweep_min = r1.number_input("Salário Inicial", 0.0, value=1000.0, step=500.0, format="%.2f")
+        sweep_max = r2.number_input("Salário Final", 0.0, value=max(base_salary * 5, 50000.0), step=500.0, format="%.2f")
+        metric = r3.selectbox("Métrica", list(METRICS.values()), index=1)
+        if sweep_max <= sweep_min:
+            st.warning("O salário final deve ser maior que o inicial.")
+            return
+        # Grade densa avaliada em lote; cada série chega ao gráfico com poucas centenas de pontos
+        curves = sweep_frame(tuple(selected_countries), sweep_min, sweep_max)
+        curves = curves[curves["Métrica"] == metric]
+        y_format = "%" if metric == METRICS["effective_rate"] else ",.2f"
+        chart = alt.Chart(curves).mark_line().encode(
+            x=alt.X('Salário', title="Salário Bruto Mensal (Nominal)"),
+            y=alt.Y('Valor', title=metric, axis=alt.Axis(format=y_format)),
+            color=alt.Color('País'),
+            tooltip=['País', alt.Tooltip('Salário', format=',.2f'), alt.Tooltip('Valor', format=y_format.replace('%', '.1%'))]
+        ).properties(height=400).interactive()
+        st.altair_chart(chart, use_container_width=True)
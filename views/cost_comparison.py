@@ -1,11 +1,37 @@
 import streamlit as st
 import pandas as pd
+from src import export
 from src.config import DATA
 from src.calculations import get_employer_cost
-from src.utils import fmt_money, fmt_percent
+from src.fx import currency_symbol
+from src.incremental import Graph
+from src.utils import fmt_money_array, fmt_percent, number_format
+from views.comparison import export_buttons, report_currency_select
+
+# --- GRAFO POR PAÍS (acrescentar um país só calcula o país novo) ---
+def build_graph() -> Graph:
+    graph = Graph()
+
+    @graph.node(inputs=("country", "report_currency", "salary", "bonus", "incide_bonus"))
+    def cost(country, report_currency, salary, bonus, incide_bonus):
+        """Custo do país em números; com moeda de relatório, entra e sai convertido."""
+        factor = 1.0
+        if report_currency:
+            local = DATA.currencies.get(country, report_currency)
+            factor = DATA.fx.rate(local, report_currency)
+            salary, bonus = salary / factor, bonus / factor
+        res = get_employer_cost(country, salary, bonus, incide_bonus)
+        base_remun = salary * res["months_factor"] + bonus
+        return {"total": res["total_cost"] * factor,
+                "charge_pct": (res["total_charges"] / base_remun) if base_remun > 0 else 0.0,
+                "multiplier": res["multiplier"],
+                "items": {name: v * factor for name, v in res.charges()}}
+
+    return graph
 
 def render_page(T: dict):
     st.title(T.get("menu_comp_cost", "Comparativo Custo Empregador"))
+    report_currency = report_currency_select(T)
 
     c1, c2, c3 = st.columns(3)
     salary = c1.number_input("Salário Base Mensal", 10000.0, step=500.0, format="%.2f")
@@ -15,36 +41,40 @@ def render_page(T: dict):
     countries = st.multiselect("Países", list(DATA.countries.keys()), default=list(DATA.countries.keys())[:3])
     if not countries: return
 
-    summary_list, details_map = [], {}
-    all_items = set()
-
-    for c in countries:
-        res = get_employer_cost(c, salary, bonus, T, incide_bonus)
-        sym = DATA.countries[c].get("symbol", "$")
-        
-        base_remun = (salary * res["months_factor"]) + bonus
-        charge_pct = (res["total_charges"] / base_remun) if base_remun > 0 else 0.0
-        
-        summary_list.append({
-            "País": f"{DATA.countries[c].get('flag','')} {c}",
-            "Custo Total Anual": fmt_money(res["total_cost"], sym),
-            "Encargos Totais (%)": fmt_percent(charge_pct),
-            "Multiplicador (x12 Sal.)": f"{res['multiplier']:.3f}x"
-        })
-        details_map[c] = {item['Item']: item['Valor'] for item in res['breakdown']}
-        all_items.update(details_map[c].keys())
+    if "cost_graph" not in st.session_state:
+        st.session_state.cost_graph = build_graph()
+    graph = st.session_state.cost_graph
+    report_sym = currency_symbol(report_currency, DATA.countries, DATA.currencies) if report_currency else None
+    syms = [report_sym or DATA.countries[c].get("symbol", "$") for c in countries]
+    nf = number_format(T)
+    inputs = {"report_currency": report_currency, "salary": salary, "bonus": bonus, "incide_bonus": incide_bonus}
+    values = {c: graph.evaluate(("cost",), {**inputs, "country": c}, scope=c) for c in countries}
+    costs = [values[c]["cost"] for c in countries]
 
+    # Quadros numéricos; a formatação é feita por coluna, só na exibição
     st.subheader("Resumo Comparativo")
-    st.dataframe(pd.DataFrame(summary_list), use_container_width=True, hide_index=True)
+    summary = pd.DataFrame({
+        "País": [f"{DATA.countries[c].get('flag','')} {c}" for c in countries],
+        "Custo Total Anual": fmt_money_array([v["total"] for v in costs], syms, nf),
+        "Encargos Totais (%)": [fmt_percent(v["charge_pct"]) for v in costs],
+        "Multiplicador (x12 Sal.)": [f"{v['multiplier']:.3f}x" for v in costs],
+    })
+    st.dataframe(summary, use_container_width=True, hide_index=True)
 
     st.subheader("Detalhamento dos Encargos (Valores Anuais)")
-    
-    detailed_data = []
-    for item in sorted(list(all_items)):
-        row = {"Encargo": item}
-        for c in countries:
-            sym = DATA.countries[c].get("symbol", "$")
-            row[c] = fmt_money(details_map[c].get(item, 0.0), sym)
-        detailed_data.append(row)
-        
-    st.dataframe(pd.DataFrame(detailed_data), use_container_width=True, hide_index=True)
+    all_items = sorted({item for v in costs for item in v["items"]})
+    detailed = pd.DataFrame({c: [v["items"].get(item, 0.0) for item in all_items] for c, v in zip(countries, costs)})
+    for c, sym in zip(countries, syms):
+        detailed[c] = fmt_money_array(detailed[c].to_numpy(), sym, nf)
+    detailed.insert(0, "Encargo", all_items)
+    st.dataframe(detailed, use_container_width=True, hide_index=True)
+
+    # Exportação: encargos em formato longo (números, não as células formatadas)
+    def cost_table():
+        rows = [(c, report_currency or DATA.currencies.get(c, ""), item, v)
+                for c in countries for item, v in values[c]["cost"]["items"].items()]
+        rows += [(c, report_currency or DATA.currencies.get(c, ""), "Custo Total Anual", values[c]["cost"]["total"])
+                 for c in countries]
+        frame = pd.DataFrame(rows, columns=["País", "Moeda", "Item", "Valor"])
+        return export.frame_table(frame.drop(columns="Moeda"), frame["Moeda"])
+    export_buttons(cost_table, "custo_empregador", "cost_export")